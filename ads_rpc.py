@@ -0,0 +1,205 @@
+"""Parse advertiser domains out of Ads Transparency Center RPC responses.
+
+The Transparency Center UI is fed by JSON RPC responses (optionally wrapped in
+Google's ")]}'" XSSI guard or the chunked batchexecute format). Rather than
+depending on field numbers that change between releases, the parser walks
+every string in the payload and keeps the ones that are bare domains or
+http(s) URLs on non-Google hosts.
+
+Run it on saved responses to check the parser offline:
+
+    python ads_rpc.py benchmarks/fixtures/ads_rpc/*.txt
+    python ads_rpc.py --check            # same check as tests/test_ads_rpc.py
+"""
+import argparse
+import asyncio
+import glob
+import json
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+XSSI_PREFIX = ")]}'"
+
+DOMAIN_RE = re.compile(r"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+[a-z]{2,63}$")
+
+# Hosts that appear in every payload (creative previews, assets) and are never advertisers
+GOOGLE_HOSTS = (
+    "google.com", "google.com.au", "googleapis.com", "gstatic.com", "googleusercontent.com",
+    "googlesyndication.com", "googleadservices.com", "doubleclick.net", "youtube.com",
+    "ytimg.com", "ggpht.com", "googlevideo.com", "adstransparency.google.com",
+)
+
+# "banner.png" looks like a domain to the regex; these suffixes are file names, not TLDs
+FILE_SUFFIXES = ("png", "jpg", "jpeg", "gif", "svg", "webp", "js", "css", "html", "htm", "json", "mp4", "webm")
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "fixtures", "ads_rpc")
+
+def load_rpc_body(body):
+    """Decodes an RPC body into a list of JSON payloads (batchexecute bodies hold several)."""
+    body = body.strip()
+    if body.startswith(XSSI_PREFIX):
+        body = body[len(XSSI_PREFIX):].lstrip()
+    try:
+        return [json.loads(body)]
+    except json.JSONDecodeError:
+        pass
+    # batchexecute: alternating length lines and JSON chunks. Only "wrb.fr" entries carry
+    # data (as a JSON string); the rest ("di", "af.httprm", "e") are protocol envelope.
+    payloads = []
+    for line in body.splitlines():
+        line = line.strip()
+        if not line.startswith("["):
+            continue
+        try:
+            chunk = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        for entry in chunk:
+            if isinstance(entry, list) and len(entry) > 2 and entry[0] == "wrb.fr" and isinstance(entry[2], str):
+                try:
+                    payloads.append(json.loads(entry[2]))
+                except json.JSONDecodeError:
+                    continue
+    return payloads
+
+def iter_strings(obj):
+    """Yields every string in a JSON value, descending into strings that are themselves JSON."""
+    if isinstance(obj, str):
+        stripped = obj.strip()
+        if stripped[:1] in ("[", "{"):
+            try:
+                yield from iter_strings(json.loads(stripped))
+                return
+            except json.JSONDecodeError:
+                pass
+        yield obj
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from iter_strings(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from iter_strings(value)
+
+def _is_google(host):
+    return any(host == g or host.endswith("." + g) for g in GOOGLE_HOSTS)
+
+def domain_from_string(value):
+    """Returns the advertiser domain a payload string refers to, or None."""
+    value = value.strip().lower()
+    if value.startswith(("http://", "https://")):
+        host = urlsplit(value).hostname or ""
+    elif DOMAIN_RE.match(value):
+        host = value
+    else:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    if not DOMAIN_RE.match(host) or _is_google(host) or host.rsplit(".", 1)[-1] in FILE_SUFFIXES:
+        return None
+    return host
+
+def extract_domains(body):
+    """Returns the unique advertiser domains in an RPC response body, in payload order."""
+    found = []
+    seen = set()
+    for payload in load_rpc_body(body):
+        for value in iter_strings(payload):
+            domain = domain_from_string(value)
+            if domain and domain not in seen:
+                seen.add(domain)
+                found.append(domain)
+    return found
+
+def is_rpc_response(response):
+    """Matches the Transparency Center's own data RPCs (not assets or analytics)."""
+    url = response.url
+    return "adstransparency.google.com" in url and "/rpc/" in url
+
+class RpcCapture:
+    """Collects domains from the page's RPC responses as they arrive via page.on("response").
+
+    Each reset() starts a new generation; a response that arrived before the
+    reset is dropped when its body is read, so one query's results never leak
+    into the next.
+    """
+
+    def __init__(self):
+        self.domains = []
+        self.responses = 0
+        self.generation = 0
+        self._arrived = asyncio.Event()
+        self._pending = set()
+
+    def attach(self, page):
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        if is_rpc_response(response):
+            task = asyncio.ensure_future(self._read(response, self.generation))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _read(self, response, generation):
+        try:
+            body = await response.text()
+        except Exception:
+            # Redirects and aborted requests have no body
+            return
+        if generation != self.generation:
+            return
+        self.responses += 1
+        self.domains.extend(extract_domains(body))
+        self._arrived.set()
+
+    def reset(self):
+        """Forgets captured domains; call right before the action that loads the next results page."""
+        self.generation += 1
+        self.domains = []
+        self._arrived.clear()
+
+    async def collect(self, timeout=10.0, quiet=0.5):
+        """Waits for the first RPC response, then until none arrive for `quiet` seconds."""
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        while True:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), quiet)
+            except asyncio.TimeoutError:
+                break
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        return list(dict.fromkeys(self.domains))
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract advertiser domains from saved Ads Transparency RPC responses")
+    parser.add_argument("files", nargs="*", help="Saved response bodies")
+    parser.add_argument("--check", action="store_true", help="Verify the parser against the bundled fixtures")
+    args = parser.parse_args()
+
+    if args.check:
+        with open(os.path.join(FIXTURE_DIR, "expected.json"), "r", encoding="utf-8") as f:
+            expected = json.load(f)
+        failed = 0
+        for name, domains in expected.items():
+            with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+                got = extract_domains(f.read())
+            status = "ok" if got == domains else "FAIL"
+            if got != domains:
+                failed += 1
+                print(f"{status} {name}: expected {domains}, got {got}")
+            else:
+                print(f"{status} {name}: {len(got)} domains")
+        sys.exit(1 if failed else 0)
+
+    for path in args.files or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.txt"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for domain in extract_domains(f.read()):
+                print(domain)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+class AnalysisCache:
+    """On-disk cache of LLM analyses keyed on the normalized page text.
+
+    Keys hash the whitespace-normalized text together with the domain, model
+    and prompt version, so a prompt or model change never serves stale verdicts.
+    Entries expire after ttl seconds, and the least recently used entries are
+    evicted once the cache holds more than max_entries.
+
+    A hit only reads; its last_used time is buffered and written together with
+    the next put() (or every touch_flush_every hits, or on close), so lookups
+    do not commit to disk.
+    """
+
+    def __init__(self, path="analysis_cache.sqlite", ttl=30 * 86400, max_entries=50000, touch_flush_every=200):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.touch_flush_every = touch_flush_every
+        self._touched = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        # analyze_content runs in executor threads, so share one connection behind a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS analyses (
+                key TEXT PRIMARY KEY,
+                domain TEXT,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS analyses_last_used ON analyses(last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(text, domain, model, prompt_version):
+        normalized = " ".join(text.split())
+        h = hashlib.sha256()
+        for part in (model, prompt_version, domain, normalized):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key):
+        """Returns the cached analysis for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT result, created_at FROM analyses WHERE key = ?", (key,)).fetchone()
+            # Expired rows are left for the next put() to evict
+            if row is None or (self.ttl and now - row[1] > self.ttl):
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_flush_every:
+                self._flush_touched()
+                self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def _flush_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE analyses SET last_used = ? WHERE key = ?",
+                                   [(used, key) for key, used in self._touched.items()])
+            self._touched = {}
+
+    def put(self, key, domain, result):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analyses (key, domain, result, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, domain, result, now, now),
+            )
+            self.stores += 1
+            self._flush_touched()
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        if self.ttl:
+            cur = self._conn.execute("DELETE FROM analyses WHERE created_at < ?", (now - self.ttl,))
+            self.evictions += cur.rowcount
+        if self.max_entries:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM analyses").fetchone()
+            if count > self.max_entries:
+                cur = self._conn.execute(
+                    "DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+                self.evictions += cur.rowcount
+
+    def stats_line(self):
+        total = self.hits + self.misses
+        rate = (100.0 * self.hits / total) if total else 0.0
+        return (f"Analysis cache: {self.hits} hits, {self.misses} misses ({rate:.0f}% hit rate), "
+                f"{self.stores} stored, {self.evictions} evicted.")
+
+    def close(self):
+        with self._lock:
+            self._flush_touched()
+            self._conn.commit()
+            self._conn.close()
@@ -0,0 +1,188 @@
+import asyncio
+import json
+import re
+
+from content_reduction import reduce_content
+
+BATCH_SYSTEM_PROMPT = ("You are a helpful assistant that analyzes website content for risk assessment. "
+                       "You always answer with valid JSON only.")
+
+BATCH_INSTRUCTIONS = """Analyze the website content of each domain below.
+Respond with ONLY a JSON array containing one object per domain, in the same order, each with these keys:
+  "domain": the domain exactly as given,
+  "summary": what the website is about in 1-2 sentences,
+  "crypto_related": true if the website is related to cryptocurrency, trading, or investing, otherwise false,
+  "risk": whether it appears to be a legitimate business or potentially suspicious/scammy, with a brief reason,
+  "contacts": an array of contact emails or social media links mentioned (empty if none).
+"""
+
+def build_batch_prompt(items):
+    """Packs (domain, text) pairs into a single prompt."""
+    parts = [BATCH_INSTRUCTIONS]
+    for domain, text in items:
+        parts.append(f"\n=== Domain: {domain} ===\n{text}\n")
+    return "".join(parts)
+
+def _extract_json_array(raw):
+    """Parses the first JSON array in a reply, tolerating ```json fences and surrounding prose."""
+    raw = re.sub(r"^```(?:json)?\s*|\s*```$", "", raw.strip())
+    start, end = raw.find("["), raw.rfind("]")
+    if start == -1 or end <= start:
+        return None
+    try:
+        data = json.loads(raw[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, list) else None
+
+def _valid_verdict(item):
+    if not isinstance(item, dict):
+        return False
+    if not all(isinstance(item.get(k), str) and item[k].strip() for k in ("domain", "summary", "risk")):
+        return False
+    if not isinstance(item.get("crypto_related"), (bool, str)):
+        return False
+    return isinstance(item.get("contacts", []), (list, str))
+
+def parse_batch_response(raw, domains):
+    """Splits a batch reply into {domain: verdict}; domains with missing or malformed items are left out."""
+    data = _extract_json_array(raw or "")
+    if data is None:
+        return {}
+    wanted = {d.lower(): d for d in domains}
+    verdicts = {}
+    for item in data:
+        if not _valid_verdict(item):
+            continue
+        domain = wanted.get(item["domain"].strip().lower())
+        if domain and domain not in verdicts:
+            verdicts[domain] = item
+    return verdicts
+
+def format_verdict(verdict):
+    """Renders a verdict in the same four-point layout as the single-domain analysis."""
+    crypto = verdict["crypto_related"]
+    if isinstance(crypto, str):
+        crypto = crypto.strip().lower().startswith(("y", "true"))
+    contacts = verdict.get("contacts") or []
+    if isinstance(contacts, str):
+        contacts = [contacts]
+    contacts_text = ", ".join(str(c) for c in contacts) if contacts else "None found."
+    return (f"1. {verdict['summary'].strip()}\n"
+            f"2. {'Yes' if crypto else 'No'}\n"
+            f"3. {verdict['risk'].strip()}\n"
+            f"4. {contacts_text}")
+
+class BatchAnalyzer:
+    """Micro-batches analyze requests into multi-domain chat completions.
+
+    Callers await analyze() as if it were a single call; requests are packed
+    until the token budget or item limit is reached, or linger seconds pass.
+    Items missing or malformed in the JSON reply are retried individually
+    through fallback(text, domain).
+    """
+
+    def __init__(self, backend, fallback, cache=None, model="", prompt_version="",
+                 token_budget=12000, max_items=8, linger=2.0, item_token_budget=4000):
+        self.backend = backend
+        self.fallback = fallback
+        self.cache = cache
+        self.model = model
+        # Batch verdicts are formatted differently, so never share cache entries with single calls
+        self.prompt_version = f"{prompt_version}-batch-t{item_token_budget}"
+        self.token_budget = token_budget
+        self.max_items = max_items
+        self.linger = linger
+        self.item_token_budget = item_token_budget
+        self.pending = []
+        self.pending_tokens = 0
+        self._timer = None
+        self._tasks = set()
+        self.batches = 0
+        self.batched_items = 0
+        self.retried_items = 0
+
+    async def analyze(self, text, domain):
+        if not text:
+            return "No content extracted."
+        key = None
+        if self.cache:
+            key = self.cache.make_key(text, domain, self.model, self.prompt_version)
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return cached
+
+        loop = asyncio.get_running_loop()
+        full_text = text
+        text, original_tokens, tokens = await loop.run_in_executor(None, reduce_content, text, self.item_token_budget)
+        print(f"  -> [{domain}] Content reduced from {original_tokens} to {tokens} tokens.")
+        if self.pending and self.pending_tokens + tokens > self.token_budget:
+            self._flush()
+
+        future = loop.create_future()
+        self.pending.append((domain, text, full_text, key, future))
+        self.pending_tokens += tokens
+        if len(self.pending) >= self.max_items or self.pending_tokens >= self.token_budget:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.linger, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        batch, self.pending, self.pending_tokens = self.pending, [], 0
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        try:
+            verdicts = {}
+            if len(batch) > 1:
+                self.batches += 1
+                prompt = build_batch_prompt([(domain, text) for domain, text, _, _, _ in batch])
+                try:
+                    raw = await self.backend.complete(
+                        [{"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                         {"role": "user", "content": prompt}],
+                        temperature=0.3,
+                    )
+                    verdicts = parse_batch_response(raw, [domain for domain, _, _, _, _ in batch])
+                except Exception as e:
+                    print(f"  -> Batch of {len(batch)} domains failed ({e}), analyzing individually.")
+
+            retries = []
+            for domain, _, full_text, key, future in batch:
+                verdict = verdicts.get(domain)
+                if verdict is None:
+                    retries.append((domain, full_text, future))
+                    continue
+                self.batched_items += 1
+                result = format_verdict(verdict)
+                if self.cache:
+                    await asyncio.to_thread(self.cache.put, key, domain, result)
+                if not future.done():
+                    future.set_result(result)
+
+            if len(batch) > 1:
+                self.retried_items += len(retries)
+            results = await asyncio.gather(*(self.fallback(text, domain) for domain, text, _ in retries),
+                                           return_exceptions=True)
+            for (domain, _, future), result in zip(retries, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as e:
+            for _, _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def stats_line(self):
+        return (f"Batch analysis: {self.batches} batched requests covering {self.batched_items} domains, "
+                f"{self.retried_items} items retried individually.")
@@ -0,0 +1,294 @@
+"""Offline end-to-end benchmark of scanner.py and scraper.py.
+
+Serves the synthetic site corpus and fake Transparency Center from
+fake_sites.py and the fake LLM from fake_openai.py, runs the real scan and
+scrape code against them (headless Chromium, no Tor, no network), and writes
+a JSON report: domains/min, p50/p95 per stage and peak RSS.
+
+    python benchmarks/bench_e2e.py --concurrency 4 --output bench_report.json
+    python benchmarks/bench_e2e.py --fetch-mode tiered --compare bench_report.json
+
+With --compare, exits non-zero if throughput drops by more than --tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.async_api import async_playwright
+
+import scanner
+import scraper
+from challenges import ChallengeHandler, DeferredRetryQueue
+from fake_openai import start_fake_openai
+from fake_sites import site_urls, start_fake_sites
+from http_fetcher import HttpFetcher
+from llm_backend import LLMBackend
+from resource_policy import DEFAULT_BLOCK_HOSTS, DEFAULT_BLOCK_TYPES, ResourcePolicy
+from timing import percentile
+
+class StageTimes:
+    """Wall-clock samples per stage, summarized as count/mean/p50/p95 seconds."""
+
+    def __init__(self):
+        self.samples = {}
+
+    def add(self, stage, seconds):
+        self.samples.setdefault(stage, []).append(seconds)
+
+    def wrap(self, fn, stage, kind_of=None):
+        """Returns an async wrapper of fn that records its duration (and per-kind, if kind_of is given)."""
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self.add(stage, elapsed)
+                if kind_of:
+                    self.add(f"{stage}:{kind_of(*args)}", elapsed)
+        return timed
+
+    def summary(self):
+        return {
+            stage: {
+                "count": len(values),
+                "mean_s": round(sum(values) / len(values), 3),
+                "p50_s": round(percentile(values, 50), 3),
+                "p95_s": round(percentile(values, 95), 3),
+            }
+            for stage, values in sorted(self.samples.items())
+        }
+
+class RssSampler:
+    """Samples resident memory of this process and its children (the browser) on a thread.
+
+    Uses psutil when installed; otherwise only this Python process's peak is known.
+    """
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        try:
+            import psutil
+            self._process = psutil.Process()
+            self.scope = "process tree"
+        except ImportError:
+            self._process = None
+            self.scope = "python process only (install psutil to include the browser)"
+
+    def _sample(self):
+        rss = self._process.memory_info().rss
+        for child in self._process.children(recursive=True):
+            try:
+                rss += child.memory_info().rss
+            except Exception:
+                pass
+        self.peak = max(self.peak, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        if self._process:
+            threading.Thread(target=self._run, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if not self._process:
+            # ru_maxrss is in KB on Linux
+            self.peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    @property
+    def peak_mb(self):
+        return round(self.peak / 1_000_000, 1)
+
+def count_results(path):
+    results = Counter()
+    with open(path, "r", encoding="utf-8") as f:
+        blocks = f.read().split("--- Domain: ")[1:]
+    for block in blocks:
+        body = block.split("---\n", 1)[-1]
+        if body.startswith(("Failed to extract content", "Error calling Kimi API", "Skipped:")):
+            results["failed"] += 1
+        else:
+            results["succeeded"] += 1
+    return results
+
+async def bench_scanner(args, sites, llm):
+    urls = [url for _, url in sites]
+    kinds = {url: kind for kind, url in sites}
+    times = StageTimes()
+    original = scanner.fetch_content, scanner.analyze_content
+    scanner.fetch_content = times.wrap(original[0], "fetch", lambda context, url, *rest: kinds.get(url, "other"))
+    scanner.analyze_content = times.wrap(original[1], "analyze")
+
+    backend = LLMBackend("fake", scanner.MODEL, base_url=llm.base_url, max_retries=args.llm_retries,
+                         max_connections=max(args.concurrency * 2, 10), backoff_base=0.2, backoff_cap=2.0)
+    fetcher = HttpFetcher(timeout=10, max_connections=max(args.concurrency * 2, 10)) if args.fetch_mode == "tiered" else None
+    challenges = ChallengeHandler(max_wait=args.challenge_wait)
+    deferred = DeferredRetryQueue(max_retries=1, base_delay=args.retry_delay) if args.retry_delay >= 0 else None
+    with tempfile.NamedTemporaryFile(suffix=".txt", prefix="bench_scan_", delete=False) as tmp:
+        out_path = tmp.name
+
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            context = await browser.new_context(ignore_https_errors=True, locale="en-US",
+                                                viewport={"width": 1920, "height": 1080})
+            start = time.perf_counter()
+            with open(out_path, "w", encoding="utf-8") as f_out:
+                await scanner.scan_domains(
+                    context, urls, f_out, backend,
+                    concurrency=args.concurrency,
+                    policy=ResourcePolicy(DEFAULT_BLOCK_TYPES, DEFAULT_BLOCK_HOSTS),
+                    fetcher=fetcher,
+                    challenges=challenges,
+                    deferred=deferred,
+                )
+            elapsed = time.perf_counter() - start
+            await browser.close()
+    finally:
+        scanner.fetch_content, scanner.analyze_content = original
+        await backend.close()
+        if fetcher:
+            await fetcher.close()
+
+    results = count_results(out_path)
+    os.remove(out_path)
+    report = {
+        "domains": len(urls),
+        "corpus": dict(Counter(kinds.values())),
+        "succeeded": results["succeeded"],
+        "failed": results["failed"],
+        "elapsed_s": round(elapsed, 2),
+        "domains_per_min": round(len(urls) / elapsed * 60, 1),
+        "stages": times.summary(),
+        "llm": {"requests": llm.requests, "errors_429": llm.errors_429, "retries": backend.retries},
+        "challenges": {"pages": challenges.pages, "encountered": dict(challenges.encountered),
+                       "cleared": dict(challenges.cleared), "seconds_waited": round(challenges.seconds_waited, 1)},
+    }
+    if fetcher:
+        report["fetch_tiers"] = dict(fetcher.tiers)
+    return report
+
+async def bench_scraper(args, sites_server):
+    times = StageTimes()
+    found = []
+    original = scraper.scrape_query
+
+    async def counted(*a, **kw):
+        n = await original(*a, **kw)
+        found.append(n)
+        return n
+
+    scraper.scrape_query = times.wrap(counted, "query")
+    scraper.ADS_TRANSPARENCY_URL = sites_server.ads_url
+    queries = [f"query {i}" for i in range(args.queries)]
+    regions = args.regions.split(",")
+    try:
+        start = time.perf_counter()
+        await scraper.scrape_ads_transparency(queries, regions, args.ads_pages, headless=True, workers=args.scraper_workers)
+        elapsed = time.perf_counter() - start
+    finally:
+        scraper.scrape_query = original
+    return {
+        "jobs": len(queries) * len(regions),
+        "pages_per_job": args.ads_pages,
+        "new_domains": sum(found),
+        "elapsed_s": round(elapsed, 2),
+        "domains_per_min": round(sum(found) / elapsed * 60, 1),
+        "stages": times.summary(),
+    }
+
+def compare(report, baseline, tolerance):
+    """Prints throughput/p95 changes against a baseline report; returns False on a regression."""
+    ok = True
+    for section in ("scanner", "scraper"):
+        new, old = report.get(section), baseline.get(section)
+        if not new or not old:
+            continue
+        change = (new["domains_per_min"] - old["domains_per_min"]) / max(old["domains_per_min"], 1e-9)
+        flag = ""
+        if change < -tolerance:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{section}: {old['domains_per_min']} -> {new['domains_per_min']} domains/min ({change:+.0%}){flag}")
+        for stage, stats in new["stages"].items():
+            before = old["stages"].get(stage)
+            if before:
+                print(f"  {stage:<18} p95 {before['p95_s']:>7.3f}s -> {stats['p95_s']:>7.3f}s")
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the scanner and scraper")
+    corpus = parser.add_argument_group("site corpus")
+    corpus.add_argument("--static", type=int, default=20, help="Static landing pages (default: 20)")
+    corpus.add_argument("--js", type=int, default=5, help="JS-rendered pages (default: 5)")
+    corpus.add_argument("--challenge", type=int, default=3, help="Challenge pages that clear (default: 3)")
+    corpus.add_argument("--stuck", type=int, default=2, help="Challenge pages that never clear (default: 2)")
+    corpus.add_argument("--slow", type=int, default=3, help="Slow pages (default: 3)")
+    corpus.add_argument("--dead", type=int, default=4, help="Dead hosts (default: 4)")
+    corpus.add_argument("--clear-after", type=float, default=2.0, help="Seconds before challenges clear (default: 2)")
+    corpus.add_argument("--slow-delay", type=float, default=5.0, help="Delay of slow pages (default: 5)")
+    scan = parser.add_argument_group("scanner")
+    scan.add_argument("--concurrency", type=int, default=4, help="Scanner fetch workers (default: 4)")
+    scan.add_argument("--fetch-mode", choices=["browser", "tiered"], default="browser")
+    scan.add_argument("--challenge-wait", type=float, default=15, help="Challenge clearance cap (default: 15)")
+    scan.add_argument("--retry-delay", type=float, default=3, help="Deferred retry backoff; negative disables retries (default: 3)")
+    scan.add_argument("--llm-latency", type=float, default=0.5, help="Fake LLM latency per completion (default: 0.5)")
+    scan.add_argument("--llm-jitter", type=float, default=0.2, help="Extra random fake LLM latency (default: 0.2)")
+    scan.add_argument("--rate-429", type=float, default=0.05, help="Fraction of fake LLM calls answered with 429 (default: 0.05)")
+    scan.add_argument("--llm-retries", type=int, default=5)
+    scrape = parser.add_argument_group("scraper")
+    scrape.add_argument("--queries", type=int, default=4, help="Queries against the fake Transparency Center (default: 4)")
+    scrape.add_argument("--regions", default="AU,GB", help="Comma-separated regions (default: AU,GB)")
+    scrape.add_argument("--ads-pages", type=int, default=3, help="Result pages per query (default: 3)")
+    scrape.add_argument("--ads-per-page", type=int, default=20, help="Domains per result page (default: 20)")
+    scrape.add_argument("--scraper-workers", type=int, default=2, help="Scraper browser contexts (default: 2)")
+    parser.add_argument("--skip-scanner", action="store_true")
+    parser.add_argument("--skip-scraper", action="store_true")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed domains/min drop vs the baseline (default: 0.2)")
+    args = parser.parse_args()
+
+    sites_server = start_fake_sites(clear_after=args.clear_after, slow_delay=args.slow_delay,
+                                    ads_pages=args.ads_pages, ads_per_page=args.ads_per_page)
+    llm = start_fake_openai(latency=args.llm_latency, jitter=args.llm_jitter, rate_429=args.rate_429, retry_after=0.5)
+    sites = site_urls(sites_server.base_url, args.static, args.js, args.challenge, args.stuck, args.slow, args.dead)
+
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")}}
+    with RssSampler() as rss:
+        if not args.skip_scanner:
+            report["scanner"] = asyncio.run(bench_scanner(args, sites, llm))
+        if not args.skip_scraper:
+            report["scraper"] = asyncio.run(bench_scraper(args, sites_server))
+    report["peak_rss_mb"] = rss.peak_mb
+    report["rss_scope"] = rss.scope
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
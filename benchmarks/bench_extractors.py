@@ -0,0 +1,96 @@
+"""Micro-benchmark comparing text extractors on saved HTML fixtures.
+
+Reports mean time per page, peak Python heap (tracemalloc) and output parity
+against the original BeautifulSoup/html.parser extractor. Extractors whose
+optional dependency is missing are skipped. Pass --browser to also time the
+in-page "dom" extractor through Playwright.
+
+    python benchmarks/bench_extractors.py [--repeat 20] [--browser] [fixtures...]
+"""
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extractors import HTML_EXTRACTORS, IN_PAGE_JS, STRIP_TAGS, normalize_whitespace
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+def parity(reference, text):
+    """Jaccard similarity of word sets, 1.0 meaning the same words were extracted."""
+    a, b = set(reference.split()), set(text.split())
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def bench_html_extractor(fn, html, repeat):
+    fn(html)  # warm up imports and caches
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = fn(html)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return text, elapsed, peak
+
+async def bench_dom_extractor(fixtures, repeat):
+    """Times set_content + the in-page extractor; memory lives in the browser, so it is not reported."""
+    from playwright.async_api import async_playwright
+    results = {}
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        for path, html in fixtures.items():
+            total = 0.0
+            for _ in range(repeat):
+                await page.set_content(html)
+                start = time.perf_counter()
+                text = normalize_whitespace(await page.evaluate(IN_PAGE_JS, STRIP_TAGS))
+                total += time.perf_counter() - start
+            results[path] = (text, total / repeat)
+        await browser.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark page text extractors")
+    parser.add_argument("fixtures", nargs="*", help="HTML files (default: benchmarks/fixtures/*.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per extractor and fixture (default: 20)")
+    parser.add_argument("--browser", action="store_true", help="Also benchmark the in-page 'dom' extractor (needs Playwright)")
+    args = parser.parse_args()
+
+    paths = args.fixtures or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    fixtures = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            fixtures[path] = f.read()
+
+    dom_results = asyncio.run(bench_dom_extractor(fixtures, args.repeat)) if args.browser else {}
+
+    print(f"{'fixture':<24} {'extractor':<11} {'ms/page':>9} {'peak KB':>9} {'parity':>7}")
+    for path, html in fixtures.items():
+        name = os.path.basename(path)
+        reference = None
+        for extractor, fn in HTML_EXTRACTORS.items():
+            try:
+                text, elapsed, peak = bench_html_extractor(fn, html, args.repeat)
+            except ImportError as e:
+                print(f"{name:<24} {extractor:<11} skipped ({e.name or e} not available)")
+                continue
+            if reference is None:
+                reference = text
+            print(f"{name:<24} {extractor:<11} {elapsed * 1000:>9.2f} {peak / 1024:>9.0f} {parity(reference, text):>7.3f}")
+        if path in dom_results:
+            text, elapsed = dom_results[path]
+            score = f"{parity(reference, text):>7.3f}" if reference is not None else f"{'n/a':>7}"
+            print(f"{name:<24} {'dom':<11} {elapsed * 1000:>9.2f} {'-':>9} {score}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Offline evaluation of the local triage rules against past LLM verdicts.
+
+Pairs page texts saved by `scanner.py --text-dir DIR` with the verdicts for the
+same domains in domain_analysis.txt, and reports how much LLM traffic triage
+would have saved and how many relevant or suspicious pages it would have
+wrongly skipped:
+
+    python scanner.py --text-dir page_texts              # any normal run, triage off
+    python benchmarks/eval_triage.py --texts page_texts --labels domain_analysis.txt --sweep
+
+Labels come from the verdict's point 2 (crypto/trading/investing: Yes/No) and
+the stance of point 3: its leading clause ("Appears legitimate: ..." vs
+"Suspicious - ..."), else any unnegated suspicious/scam/fraud/red-flag wording
+("no obvious scam red-flags" does not count). Verdicts written as JSON (the
+batch format, with "crypto_related" and "risk") are read directly.
+Alternatively, --jsonl takes records of {"domain", "text", "relevant", "suspicious"}.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from triage import HIGH, SKIP, Triager, score
+
+_SUSPICIOUS = r"(suspicious|scam\w*|fraud\w*|ponzi|red[- ]flags?|high[- ]risk)"
+SUSPICIOUS_RE = re.compile(rf"\b{_SUSPICIOUS}\b", re.IGNORECASE)
+LEGITIMATE_RE = re.compile(r"\b(legitimate|legit|genuine|trustworthy|reputable)\b", re.IGNORECASE)
+# "no obvious scam red-flags", "without signs of fraud", "does not appear to be suspicious"
+NEGATED_SUSPICIOUS_RE = re.compile(rf"\b(no|not|without|free (of|from)|lacks?|absence of|nothing)\b[^.;:]{{0,40}}?\b{_SUSPICIOUS}\b",
+                                   re.IGNORECASE)
+NEGATED_LEGITIMATE_RE = re.compile(r"\b(not|n't|doubtful|questionable)\b[^.;:]{0,20}?\b(legitimate|legit|genuine|trustworthy)\b",
+                                   re.IGNORECASE)
+LEAD_CLAUSE_RE = re.compile(r"[:.;\u2013\u2014]| - ")
+
+def file_key(domain):
+    """Matches scanner.py's --text-dir file naming."""
+    return re.sub(r"[^\w.-]", "_", domain)
+
+def _stances(text):
+    """Returns [(position, suspicious)] for each stance term in text, negations resolved."""
+    stances = [(m.start(), True) for m in NEGATED_LEGITIMATE_RE.finditer(text)]
+    text = NEGATED_LEGITIMATE_RE.sub(lambda m: " " * len(m.group()), text)
+    text = NEGATED_SUSPICIOUS_RE.sub(lambda m: " " * len(m.group()), text)
+    stances += [(m.start(), True) for m in SUSPICIOUS_RE.finditer(text)]
+    stances += [(m.start(), False) for m in LEGITIMATE_RE.finditer(text)]
+    return sorted(stances)
+
+def is_suspicious(risk_text):
+    """Reads the verdict's stance: the leading clause decides, else any unnegated suspicious wording."""
+    text = risk_text.strip().strip("*").strip()
+    lead = _stances(LEAD_CLAUSE_RE.split(text, 1)[0])
+    if lead:
+        return lead[0][1]
+    return any(suspicious for _, suspicious in _stances(text))
+
+def _json_verdict(body):
+    """Returns (relevant, suspicious) from a JSON verdict with "crypto_related" and "risk", else None."""
+    start, end = body.find("{"), body.rfind("}")
+    if start == -1 or end <= start:
+        return None
+    try:
+        verdict = json.loads(body[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(verdict, dict) or "crypto_related" not in verdict or not isinstance(verdict.get("risk"), str):
+        return None
+    relevant = verdict["crypto_related"]
+    if isinstance(relevant, str):
+        relevant = relevant.strip().lower().startswith(("y", "true"))
+    return bool(relevant), is_suspicious(verdict["risk"])
+
+def parse_labels(path):
+    """Returns {file key: (relevant, suspicious)} from the LLM verdicts in an analysis output file."""
+    labels = {}
+    with open(path, "r", encoding="utf-8") as f:
+        blocks = f.read().split("--- Domain: ")[1:]
+    for block in blocks:
+        domain, _, body = block.partition(" ---\n")
+        lines = [line for line in body.strip().splitlines() if not line.startswith("Cluster:")]
+        if not lines or lines[0].startswith(("Failed to extract", "Error calling Kimi API", "Skipped:")):
+            continue
+        if lines[0].lstrip().startswith(("{", "```")):
+            verdict = _json_verdict("\n".join(lines))
+            if verdict:
+                labels[file_key(domain.strip())] = verdict
+            continue
+        points = {}
+        for line in lines:
+            match = re.match(r"\s*\**([1-4])[.)]\**\s*(.*)", line)
+            if match:
+                points[match.group(1)] = match.group(2)
+            elif points:
+                # Continuation of the previous point
+                last = max(points)
+                points[last] += " " + line.strip()
+        if "2" not in points:
+            continue
+        relevant = points["2"].strip().lower().startswith("yes")
+        labels[file_key(domain.strip())] = (relevant, is_suspicious(points.get("3", "")))
+    return labels
+
+def load_examples(args):
+    """Returns [(name, text, relevant, suspicious)]."""
+    examples = []
+    if args.jsonl:
+        with open(args.jsonl, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    examples.append((record["domain"], record["text"], bool(record["relevant"]),
+                                     bool(record.get("suspicious"))))
+        return examples
+    labels = parse_labels(args.labels)
+    for name in sorted(os.listdir(args.texts)):
+        key = name[:-4] if name.endswith(".txt") else name
+        if key in labels:
+            with open(os.path.join(args.texts, name), "r", encoding="utf-8", errors="replace") as f:
+                examples.append((key, f.read(), *labels[key]))
+    return examples
+
+def evaluate(scored, triager):
+    """Returns metrics for one threshold setting over [(name, relevance, risk, relevant, suspicious)]."""
+    total = len(scored)
+    decisions = [(triager.decide(relevance, risk), relevant, suspicious)
+                 for _, relevance, risk, relevant, suspicious in scored]
+    skipped = sum(d == SKIP for d, _, _ in decisions)
+    relevant_total = sum(r for _, r, _ in decisions)
+    suspicious_total = sum(s for _, _, s in decisions)
+    high = [s for d, _, s in decisions if d == HIGH]
+
+    def recall(hits, total):
+        return round(hits / total, 3) if total else None
+
+    return {
+        "pages": total,
+        "skipped": skipped,
+        "llm_calls_saved_pct": round(100 * skipped / total, 1) if total else 0.0,
+        "relevant_recall": recall(sum(r and d != SKIP for d, r, _ in decisions), relevant_total),
+        "suspicious_recall": recall(sum(s and d != SKIP for d, _, s in decisions), suspicious_total),
+        "high_priority": len(high),
+        "high_priority_precision": recall(sum(high), len(high)),
+        "high_priority_recall": recall(sum(high), suspicious_total),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate triage thresholds against labeled past results")
+    parser.add_argument("--texts", default="page_texts", help="Directory written by scanner.py --text-dir (default: %(default)s)")
+    parser.add_argument("--labels", default="domain_analysis.txt", help="Analysis output with the LLM verdicts (default: %(default)s)")
+    parser.add_argument("--jsonl", help="Labeled records instead of --texts/--labels")
+    parser.add_argument("--min-relevance", type=float, default=3)
+    parser.add_argument("--min-risk", type=int, default=2)
+    parser.add_argument("--high-risk", type=int, default=5)
+    parser.add_argument("--sweep", action="store_true", help="Also report savings and recall for a range of --min-relevance values")
+    parser.add_argument("--show-misses", type=int, default=10, help="List up to N relevant pages that would have been skipped")
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    examples = load_examples(args)
+    if not examples:
+        print("No labeled pages found (texts without a matching verdict are ignored).")
+        sys.exit(1)
+    scored = []
+    for name, text, relevant, suspicious in examples:
+        relevance, risk, _ = score(text)
+        scored.append((name, relevance, risk, relevant, suspicious))
+
+    triager = Triager(args.min_relevance, args.min_risk, args.high_risk)
+    report = {"thresholds": {"min_relevance": args.min_relevance, "min_risk": args.min_risk, "high_risk": args.high_risk},
+              **evaluate(scored, triager)}
+    print(f"{report['pages']} labeled pages ({sum(e[2] for e in examples)} relevant, {sum(e[3] for e in examples)} suspicious)")
+    print(f"Skipped: {report['skipped']} ({report['llm_calls_saved_pct']}% of LLM calls saved)")
+    print(f"Recall: relevant {report['relevant_recall']}, suspicious {report['suspicious_recall']}")
+    print(f"High priority: {report['high_priority']} pages, precision {report['high_priority_precision']}, "
+          f"recall {report['high_priority_recall']} (vs suspicious)")
+
+    misses = [(name, relevance, risk) for name, relevance, risk, relevant, _ in scored
+              if relevant and triager.decide(relevance, risk) == SKIP]
+    if misses and args.show_misses:
+        print("Relevant pages that would have been skipped:")
+        for name, relevance, risk in misses[:args.show_misses]:
+            print(f"  {name} (relevance {relevance:g}, risk {risk})")
+
+    if args.sweep:
+        report["sweep"] = []
+        print(f"\n{'min_relevance':>13} {'saved %':>8} {'relevant':>9} {'suspicious':>11}")
+        for min_relevance in range(1, 9):
+            row = evaluate(scored, Triager(min_relevance, args.min_risk, args.high_risk))
+            row["min_relevance"] = min_relevance
+            report["sweep"].append(row)
+            print(f"{min_relevance:>13} {row['llm_calls_saved_pct']:>8} {str(row['relevant_recall']):>9} "
+                  f"{str(row['suspicious_recall']):>11}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Local fake of the OpenAI-compatible chat completions API.
+
+Serves /v1/models and /v1/chat/completions with configurable latency and
+injected 429/500 errors, so the scanner's LLM backend can be exercised
+offline:
+
+    python benchmarks/fake_openai.py --port 8765 --latency 0.5 --rate-429 0.2
+    MOONSHOT_API_KEY=fake MOONSHOT_BASE_URL=http://127.0.0.1:8765/v1 python scanner.py
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def canned_batch_analysis(prompt):
+    """Builds a JSON array verdict for every '=== Domain: x ===' section of a batch prompt."""
+    sections = re.split(r"^=== Domain: (.+?) ===$", prompt, flags=re.MULTILINE)[1:]
+    verdicts = []
+    for domain, text in zip(sections[0::2], sections[1::2]):
+        crypto = any(w in text.lower() for w in ("bitcoin", "crypto", "trading", "invest"))
+        verdicts.append({"domain": domain, "summary": f"{domain} is a website (fake analysis).",
+                         "crypto_related": crypto, "risk": "Unable to judge legitimacy in fake mode.",
+                         "contacts": []})
+    return json.dumps(verdicts)
+
+def canned_analysis(prompt):
+    """Builds a deterministic reply in the scanner's four-point format (or JSON for batch prompts)."""
+    if "=== Domain: " in prompt:
+        return canned_batch_analysis(prompt)
+    match = re.search(r"for the domain '([^']+)'", prompt)
+    domain = match.group(1) if match else "unknown"
+    crypto = any(w in prompt.lower() for w in ("bitcoin", "crypto", "trading", "invest"))
+    return (f"1. {domain} is a website (fake analysis).\n"
+            f"2. {'Yes' if crypto else 'No'}\n"
+            f"3. Unable to judge legitimacy in fake mode.\n"
+            f"4. No contacts extracted.")
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server_version = "FakeOpenAI/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [
+                {"id": self.server.model, "object": "model", "created": 0, "owned_by": "fake"}
+            ]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        srv = self.server
+        with srv.lock:
+            srv.requests += 1
+        time.sleep(srv.latency + random.uniform(0, srv.jitter))
+
+        roll = random.random()
+        if roll < srv.rate_429:
+            with srv.lock:
+                srv.errors_429 += 1
+            self._send_json(429, {"error": {"message": "rate limited", "type": "rate_limit_reached_error"}},
+                            {"Retry-After": str(srv.retry_after)} if srv.retry_after else None)
+            return
+        if roll < srv.rate_429 + srv.rate_500:
+            with srv.lock:
+                srv.errors_500 += 1
+            self._send_json(500, {"error": {"message": "internal error", "type": "server_error"}})
+            return
+
+        messages = request.get("messages", [])
+        prompt = messages[-1]["content"] if messages else ""
+        content = srv.responder(prompt, request)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4
+        self._send_json(200, {
+            "id": f"chatcmpl-fake-{srv.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", srv.model),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                      "total_tokens": prompt_tokens + len(content) // 4},
+        })
+
+def start_fake_openai(host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_429=0.0, rate_500=0.0,
+                      retry_after=None, model="kimi-k2-turbo-preview", responder=None, verbose=False):
+    """Starts the fake server on a background thread and returns it; base URL is server.base_url."""
+    server = ThreadingHTTPServer((host, port), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.jitter = jitter
+    server.rate_429 = rate_429
+    server.rate_500 = rate_500
+    server.retry_after = retry_after
+    server.model = model
+    server.responder = responder or (lambda prompt, request: canned_analysis(prompt))
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = server.errors_429 = server.errors_500 = 0
+    server.base_url = f"http://{host}:{server.server_address[1]}/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds added to every completion (default: 0.2)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency up to this many seconds")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="Fraction of completions answered with 429")
+    parser.add_argument("--rate-500", type=float, default=0.0, help="Fraction of completions answered with 500")
+    parser.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = start_fake_openai(args.host, args.port, args.latency, args.jitter, args.rate_429,
+                               args.rate_500, args.retry_after, verbose=args.verbose)
+    print(f"Fake OpenAI API listening on {server.base_url} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
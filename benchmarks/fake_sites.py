@@ -0,0 +1,219 @@
+"""Local corpus of synthetic advertiser sites plus a fake Ads Transparency Center.
+
+Site kinds, served under /site/<kind>/<n>:
+
+    static     plain HTML landing page
+    js         empty app shell rendered by script after a short delay
+    challenge  503 "Just a moment..." page that redirects to the real page after --clear-after seconds
+    stuck      503 challenge page that never clears
+    slow       static page answered after --slow-delay seconds
+
+Dead hosts are URLs on a closed local port and on the reserved .invalid TLD.
+
+/ads/ mimics the parts of the Transparency Center UI that scraper.py drives
+(search box, "See more results", "By domain" tab, paginated domain rows), with
+domains derived from the query and region:
+
+    python benchmarks/fake_sites.py --port 8780
+    ADS_TRANSPARENCY_URL=http://127.0.0.1:8780/ads python scraper.py Bitcoin --max-pages 3
+"""
+import argparse
+import html
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+SITE_KINDS = ("static", "js", "challenge", "stuck", "slow")
+
+BRANDS = ["Coin", "Yield", "Chain", "Block", "Vault", "Ledger", "Quantum", "Nova", "Apex", "Orbit"]
+
+def landing_text(n):
+    brand = f"{BRANDS[n % len(BRANDS)]}{BRANDS[(n // len(BRANDS)) % len(BRANDS)]} {n}"
+    paragraphs = [
+        f"{brand} is the smartest way to grow your Bitcoin and Ethereum portfolio.",
+        "Our AI trading bot delivers guaranteed daily returns of up to 4.5% with zero risk.",
+        f"Over {1000 + 37 * n} investors joined this week. Offer ends in 02:59:{n % 60:02d}!",
+        "Deposit USDT to wallet 0x" + f"{n:040x}" + " and withdraw any time.",
+        f"Contact support@{brand.split()[0].lower()}.example or WhatsApp +44 7700 900{n % 1000:03d}.",
+        f"{brand} Ltd is registered in Saint Vincent and the Grenadines, company no. {200000 + n}.",
+    ]
+    return brand, paragraphs
+
+def static_page(n):
+    brand, paragraphs = landing_text(n)
+    body = "\n".join(f"<p>{html.escape(p)}</p>" for p in paragraphs)
+    return (f"<!doctype html><html><head><title>{html.escape(brand)} - Crypto Profits</title></head>"
+            f"<body><nav><a href='/'>Home</a> <a href='/plans'>Plans</a></nav><main><h1>{html.escape(brand)}</h1>"
+            f"{body}</main><footer>Copyright {html.escape(brand)}</footer></body></html>")
+
+def js_page(n):
+    brand, paragraphs = landing_text(n)
+    data = json.dumps({"brand": brand, "paragraphs": paragraphs})
+    return (f"<!doctype html><html><head><title>{html.escape(brand)}</title></head><body>"
+            "<noscript>You need to enable JavaScript to run this app.</noscript><div id=\"root\"></div>"
+            f"<script>const data = {data};"
+            "setTimeout(() => { const root = document.getElementById('root');"
+            "root.innerHTML = '<h1>' + data.brand + '</h1>' + data.paragraphs.map(p => '<p>' + p + '</p>').join(''); }, 300);"
+            "</script></body></html>")
+
+def challenge_page(n, clear_after):
+    redirect = (f"<script>setTimeout(() => location.replace('/site/static/{n}'), {int(clear_after * 1000)});</script>"
+                if clear_after is not None else "")
+    return ("<!doctype html><html><head><title>Just a moment...</title></head><body>"
+            "<div id=\"challenge-running\">Checking if the site connection is secure</div>"
+            f"{redirect}</body></html>")
+
+# Minimal stand-in for the Transparency Center UI; labels and selectors match scraper.py
+ADS_PAGE = """<!doctype html><html><head><title>Ads Transparency Center</title></head><body>
+<input type="text" id="search" placeholder="Search by advertiser or website name">
+<div id="suggest"></div><div id="results"></div>
+<script>
+const PAGES = %(pages)d, PER_PAGE = %(per_page)d, DELAY = %(delay)d;
+const region = new URLSearchParams(location.search).get('region') || 'AU';
+let query = '', page = 0;
+function slug(s) { return s.toLowerCase().replace(/[^a-z0-9]+/g, '-').replace(/^-|-$/g, ''); }
+function domainsFor(p) {
+  const out = [];
+  for (let i = 0; i < PER_PAGE; i++) {
+    // Every third row is shared across queries, like real advertisers bidding on many keywords
+    out.push(i %% 3 === 0 ? `shared-${p}-${i}.example` : `${slug(query)}-${region.toLowerCase()}-${p}-${i}.example`);
+  }
+  return out;
+}
+function renderPage() {
+  const res = document.getElementById('results');
+  res.querySelectorAll('div[role=row], div[aria-label="Next page"]').forEach(el => el.remove());
+  setTimeout(() => {
+    for (const d of domainsFor(page)) {
+      const row = document.createElement('div');
+      row.setAttribute('role', 'row');
+      row.innerHTML = `<span class="name">${d}</span><span>Verified</span>`;
+      res.appendChild(row);
+    }
+    const next = document.createElement('div');
+    next.setAttribute('aria-label', 'Next page');
+    next.setAttribute('aria-disabled', page >= PAGES - 1 ? 'true' : 'false');
+    next.textContent = '>';
+    next.onclick = () => { if (page < PAGES - 1) { page++; renderPage(); } };
+    res.appendChild(next);
+  }, DELAY);
+}
+document.getElementById('search').addEventListener('input', (e) => {
+  query = e.target.value;
+  document.getElementById('suggest').innerHTML = '<div id="more">See more results</div>';
+  document.getElementById('more').onclick = () => {
+    setTimeout(() => {
+      document.getElementById('results').innerHTML = '<div id="tab">By domain</div>';
+      document.getElementById('tab').onclick = () => { page = 0; renderPage(); };
+    }, DELAY);
+  };
+});
+</script></body></html>"""
+
+class FakeSitesHandler(BaseHTTPRequestHandler):
+    server_version = "FakeSites/1.0"
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_html(self, status, body):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        with self.server.lock:
+            self.server.requests += 1
+        if path.rstrip("/") == "/ads":
+            return self._send_html(200, ADS_PAGE % self.server.ads_options)
+        match = re.fullmatch(r"/site/([a-z]+)/(\d+)", path)
+        if not match or match.group(1) not in SITE_KINDS:
+            return self._send_html(404, "<html><body>Not found</body></html>")
+        kind, n = match.group(1), int(match.group(2))
+        if kind == "static":
+            self._send_html(200, static_page(n))
+        elif kind == "js":
+            self._send_html(200, js_page(n))
+        elif kind == "challenge":
+            self._send_html(503, challenge_page(n, self.server.clear_after))
+        elif kind == "stuck":
+            self._send_html(503, challenge_page(n, None))
+        elif kind == "slow":
+            time.sleep(self.server.slow_delay)
+            self._send_html(200, static_page(n))
+
+def closed_port():
+    """Returns a local port nothing listens on (connections are refused)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_fake_sites(host="127.0.0.1", port=0, clear_after=2.0, slow_delay=5.0, ads_pages=3, ads_per_page=20,
+                     ads_delay=0.2, verbose=False):
+    """Starts the site corpus on a background thread; URLs are under server.base_url."""
+    server = ThreadingHTTPServer((host, port), FakeSitesHandler)
+    server.daemon_threads = True
+    server.clear_after = clear_after
+    server.slow_delay = slow_delay
+    server.ads_options = {"pages": ads_pages, "per_page": ads_per_page, "delay": int(ads_delay * 1000)}
+    server.verbose = verbose
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    server.ads_url = server.base_url + "/ads"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def site_urls(base_url, static=20, js=5, challenge=3, stuck=2, slow=3, dead=4):
+    """Returns (kind, url) pairs for a corpus mix, interleaved so every kind shows up early."""
+    groups = []
+    counts = {"static": static, "js": js, "challenge": challenge, "stuck": stuck, "slow": slow}
+    n = 0
+    for kind, count in counts.items():
+        group = []
+        for _ in range(count):
+            group.append((kind, f"{base_url}/site/{kind}/{n}"))
+            n += 1
+        groups.append(group)
+    refused = closed_port()
+    groups.append([("dead", f"http://127.0.0.1:{refused}/site/{i}" if i % 2 == 0 else f"http://dead-{i}.invalid/")
+                   for i in range(dead)])
+    mixed = []
+    while any(groups):
+        for group in groups:
+            if group:
+                mixed.append(group.pop(0))
+    return mixed
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic advertiser sites and a fake Ads Transparency Center")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8780)
+    parser.add_argument("--clear-after", type=float, default=2.0, help="Seconds before a challenge page redirects (default: 2)")
+    parser.add_argument("--slow-delay", type=float, default=5.0, help="Response delay of slow sites (default: 5)")
+    parser.add_argument("--ads-pages", type=int, default=3, help="Result pages per query on the fake Transparency Center")
+    parser.add_argument("--ads-per-page", type=int, default=20, help="Domains per result page")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args()
+
+    server = start_fake_sites(args.host, args.port, args.clear_after, args.slow_delay, args.ads_pages,
+                              args.ads_per_page, verbose=args.verbose)
+    print(f"Fake sites on {server.base_url}/site/<kind>/<n> ({', '.join(SITE_KINDS)}); "
+          f"fake Transparency Center on {server.ads_url} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Local stand-in for a Tor SOCKS port.
+
+A SOCKS5 proxy (no-auth and username/password) that connects directly and
+counts connections per username, so circuit isolation and rotation in
+tor_pool.py can be checked without Tor:
+
+    python benchmarks/fake_socks.py --port 19050 --port 19052
+    python scanner.py --tor-endpoints 127.0.0.1:19050,127.0.0.1:19052
+"""
+import argparse
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+
+class FakeSocksHandler(socketserver.BaseRequestHandler):
+    def _read(self, n):
+        data = b""
+        while len(data) < n:
+            chunk = self.request.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError("client closed")
+            data += chunk
+        return data
+
+    def handle(self):
+        try:
+            _, n_methods = self._read(2)
+            methods = self._read(n_methods)
+            username = ""
+            if 0x02 in methods:
+                self.request.sendall(b"\x05\x02")
+                self._read(1)
+                username = self._read(self._read(1)[0]).decode()
+                self._read(self._read(1)[0])
+                self.request.sendall(b"\x01\x00")
+            elif 0x00 in methods:
+                self.request.sendall(b"\x05\x00")
+            else:
+                self.request.sendall(b"\x05\xff")
+                return
+
+            _, cmd, _, atyp = self._read(4)
+            if atyp == 0x01:
+                host = socket.inet_ntoa(self._read(4))
+            elif atyp == 0x03:
+                host = self._read(self._read(1)[0]).decode()
+            else:
+                host = socket.inet_ntop(socket.AF_INET6, self._read(16))
+            (port,) = struct.unpack("!H", self._read(2))
+            with self.server.lock:
+                self.server.connections[username] += 1
+            if cmd != 0x01:
+                self.request.sendall(b"\x05\x07\x00\x01" + b"\x00" * 6)
+                return
+            try:
+                upstream = socket.create_connection((host, port), timeout=10)
+            except OSError:
+                self.request.sendall(b"\x05\x05\x00\x01" + b"\x00" * 6)
+                return
+            self.request.sendall(b"\x05\x00\x00\x01" + b"\x00" * 6)
+            self._relay(upstream)
+        except (ConnectionError, OSError):
+            pass
+
+    def _relay(self, upstream):
+        def forward(src, dst):
+            try:
+                while True:
+                    data = src.recv(65536)
+                    if not data:
+                        break
+                    dst.sendall(data)
+            except OSError:
+                pass
+            finally:
+                try:
+                    dst.shutdown(socket.SHUT_WR)
+                except OSError:
+                    pass
+
+        thread = threading.Thread(target=forward, args=(upstream, self.request), daemon=True)
+        thread.start()
+        forward(self.request, upstream)
+        thread.join()
+        upstream.close()
+
+def start_fake_socks(host="127.0.0.1", port=0):
+    """Starts the proxy on a background thread; server.connections counts CONNECTs per username."""
+    server = socketserver.ThreadingTCPServer((host, port), FakeSocksHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.connections = Counter()
+    server.endpoint = f"{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local SOCKS5 stand-ins for Tor ports")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, action="append", help="Port to listen on (repeatable, default: 19050)")
+    args = parser.parse_args()
+
+    servers = [start_fake_socks(args.host, port) for port in args.port or [19050]]
+    print(f"Fake SOCKS5 proxies listening on {', '.join(s.endpoint for s in servers)} (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers:
+            print(f"{server.endpoint}: {dict(server.connections) or 'no connections'}")
+            server.shutdown()
+
+if __name__ == "__main__":
+    main()
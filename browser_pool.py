@@ -0,0 +1,213 @@
+"""Managed Chromium for long scans: context recycling, memory watchdog, crash recovery.
+
+Each fetch worker gets its own browser context, replaced after recycle_every
+domains so cookies, service workers and cache from earlier sites do not pile
+up. A watchdog samples the resident memory of the browser's process tree and
+restarts the browser once it grows past max_rss_mb; the restart waits for
+in-flight pages to finish. If the browser dies, the next fetch relaunches it,
+and the fetches it took down are reported as lost so they can be re-queued.
+
+Memory is sampled with psutil when it is installed; without it the watchdog
+only counts domains and restarts are limited to crashes.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+class Lease:
+    """A worker's context for one fetch; `lost` is set if the browser died meanwhile."""
+
+    def __init__(self, context):
+        self.context = context
+        self.lost = False
+
+class BrowserPool:
+    """Owns the Chromium process and hands out per-worker contexts.
+
+    Contexts are opened with context_options (plus the worker's Tor circuit as
+    proxy, if any) and live until they have served recycle_every domains, the
+    worker's circuit changes, or the browser is restarted.
+    """
+
+    def __init__(self, playwright, launch_args, context_options, recycle_every=100, max_rss_mb=0, check_interval=60.0):
+        self.playwright = playwright
+        self.launch_args = launch_args
+        self.context_options = context_options
+        self.recycle_every = recycle_every
+        self.max_rss_mb = max_rss_mb
+        self.check_interval = check_interval
+        self.browser = None
+        self.generation = 0
+        self.crashes = 0
+        self.restarts = 0
+        self.recycled = 0
+        self.fetches = 0
+        self.samples = []
+        self._contexts = {}
+        self._active = 0
+        self._restarting = False
+        self._restart_reason = None
+        self._closing = False
+        self._cond = asyncio.Condition()
+        self._launch_lock = asyncio.Lock()
+        self._watch_task = None
+        self._started = time.monotonic()
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    async def start(self):
+        await self._launch()
+        self._watch_task = asyncio.create_task(self._watch())
+        if self.max_rss_mb and not self._process:
+            print("Note: install psutil to restart the browser on memory growth; only crashes are handled.")
+        return self
+
+    async def _launch(self):
+        self.browser = await self.playwright.chromium.launch(**self.launch_args)
+        self.generation += 1
+        self.browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, browser):
+        if browser is self.browser and not self._closing:
+            self.crashes += 1
+            print(f"  -> Browser disconnected unexpectedly (crash {self.crashes}); relaunching on next fetch.")
+
+    async def _ensure_browser(self):
+        async with self._launch_lock:
+            if self.browser is None or not self.browser.is_connected():
+                await self._launch()
+
+    async def new_context(self, circuit=None):
+        options = dict(self.context_options)
+        if circuit:
+            options["proxy"] = await circuit.browser_proxy()
+        return await self.browser.new_context(**options)
+
+    async def _context_for(self, worker, circuit):
+        entry = self._contexts.get(worker)
+        if entry:
+            context, generation, uses, entry_circuit = entry
+            if generation == self.generation and uses < self.recycle_every and entry_circuit is circuit:
+                self._contexts[worker] = (context, generation, uses + 1, circuit)
+                return context
+            if generation == self.generation and uses >= self.recycle_every:
+                self.recycled += 1
+            await self._close_context(worker)
+        context = await self.new_context(circuit)
+        self._contexts[worker] = (context, self.generation, 1, circuit)
+        return context
+
+    async def _close_context(self, worker):
+        entry = self._contexts.pop(worker, None)
+        if entry:
+            try:
+                await entry[0].close()
+            except Exception:
+                # Already gone with a crashed browser
+                pass
+
+    @asynccontextmanager
+    async def lease(self, worker, circuit=None):
+        """Yields a Lease on the worker's context; waits while the browser is being restarted."""
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._restarting)
+            self._active += 1
+        crashes = self.crashes
+        try:
+            await self._ensure_browser()
+            lease = Lease(await self._context_for(worker, circuit))
+            self.fetches += 1
+            try:
+                yield lease
+            finally:
+                lease.lost = self.crashes != crashes or not self.browser.is_connected()
+        finally:
+            async with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+        if self._restart_reason:
+            await self.restart(self._restart_reason)
+
+    async def release(self, worker):
+        """Closes the worker's context when it stops fetching."""
+        await self._close_context(worker)
+
+    async def restart(self, reason):
+        """Closes every context and the browser once in-flight fetches finish, then relaunches."""
+        async with self._cond:
+            if self._restarting:
+                return
+            self._restarting = True
+            await self._cond.wait_for(lambda: self._active == 0)
+        try:
+            print(f"  -> Restarting browser ({reason})...")
+            for worker in list(self._contexts):
+                await self._close_context(worker)
+            self._closing = True
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            finally:
+                self._closing = False
+            await self._launch()
+            self.restarts += 1
+        finally:
+            async with self._cond:
+                self._restarting = False
+                self._restart_reason = None
+                self._cond.notify_all()
+
+    def rss_mb(self):
+        """Resident memory of this process and its children (Playwright driver and Chromium), or None."""
+        if not self._process:
+            return None
+        rss = 0
+        for proc in [self._process] + self._process.children(recursive=True):
+            try:
+                rss += proc.memory_info().rss
+            except Exception:
+                # Renderer processes come and go between listing and sampling
+                pass
+        return rss / 1_000_000
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.check_interval)
+            rss = self.rss_mb()
+            elapsed = time.monotonic() - self._started
+            self.samples.append((elapsed, rss, self.fetches))
+            if rss is not None:
+                print(f"  -> [memory] {elapsed / 60:.0f} min: {rss:.0f} MB after {self.fetches} fetches "
+                      f"(browser #{self.generation})")
+                if self.max_rss_mb and rss > self.max_rss_mb and not self._restart_reason:
+                    self._restart_reason = f"{rss:.0f} MB > {self.max_rss_mb} MB"
+
+    def summary(self):
+        line = (f"Browser: {self.fetches} fetches, {self.recycled} contexts recycled, "
+                f"{self.restarts} memory restarts, {self.crashes} crashes.")
+        measured = [(t, rss, n) for t, rss, n in self.samples if rss is not None]
+        if not measured:
+            return line
+        lines = [line, f"  {'min':>6} {'MB':>7} {'fetches':>8}"]
+        # At most ~10 rows, always including the last sample
+        step = max(1, len(measured) // 10)
+        for t, rss, n in measured[::step] + ([measured[-1]] if (len(measured) - 1) % step else []):
+            lines.append(f"  {t / 60:>6.0f} {rss:>7.0f} {n:>8}")
+        lines.append(f"  peak {max(rss for _, rss, _ in measured):.0f} MB")
+        return "\n".join(lines)
+
+    async def close(self):
+        if self._watch_task:
+            self._watch_task.cancel()
+            await asyncio.gather(self._watch_task, return_exceptions=True)
+        for worker in list(self._contexts):
+            await self._close_context(worker)
+        self._closing = True
+        try:
+            await self.browser.close()
+        except Exception:
+            pass
@@ -0,0 +1,150 @@
+import asyncio
+import heapq
+import random
+import time
+from collections import Counter
+
+# Statuses that usually mean a bot wall rather than the real page
+CHALLENGE_STATUSES = (202, 403, 429, 503)
+
+# Cloudflare / DDoS-Guard / generic interstitial markers (matched on lowercased HTML)
+CHALLENGE_MARKERS = (
+    "just a moment", "checking your browser", "cf-browser-verification", "challenge-platform",
+    "cf_chl_", "ddos-guard", "attention required! | cloudflare", "enable javascript and cookies to continue",
+)
+
+# Runs inside the page: names the challenge vendor whose interstitial is showing, or null
+DETECT_JS = """
+() => {
+    const title = (document.title || '').toLowerCase();
+    const has = (selector) => document.querySelector(selector) !== null;
+    if (has('#challenge-running, #challenge-form, #challenge-stage, #cf-challenge-running, iframe[src*="challenges.cloudflare.com"]')
+        || title.includes('just a moment') || title.includes('attention required')) return 'cloudflare';
+    if (has('#ddg-captcha, #ddos-guard, [id^="ddg-"]') || title.includes('ddos-guard')) return 'ddos-guard';
+    if (title.includes('checking your browser') || title.includes('security check')) return 'generic';
+    return null;
+}
+"""
+
+class ChallengeHandler:
+    """Detects anti-bot interstitials and waits for them to clear, up to max_wait seconds.
+
+    Instead of a fixed sleep, it polls until the vendor's challenge markers are
+    gone (or, for an unrecognised 202/503 page, until the page navigates), so a
+    challenge that clears in 2 seconds costs 2 seconds. Keeps per-run stats.
+    """
+
+    def __init__(self, max_wait=15.0, poll=0.5):
+        self.max_wait = max_wait
+        self.poll = poll
+        self.pages = 0
+        self.encountered = Counter()
+        self.cleared = Counter()
+        self.seconds_waited = 0.0
+
+    async def detect(self, page, response):
+        """Returns the challenge vendor ("cloudflare", "ddos-guard", "generic", "unknown") or None."""
+        try:
+            vendor = await page.evaluate(DETECT_JS)
+        except Exception:
+            vendor = None
+        if not vendor and response and response.status in (202, 503):
+            vendor = "unknown"
+        return vendor
+
+    async def handle(self, page, response):
+        """Returns (vendor, cleared) for a freshly navigated page; vendor is None if there was no challenge."""
+        self.pages += 1
+        vendor = await self.detect(page, response)
+        if not vendor:
+            return None, True
+        self.encountered[vendor] += 1
+
+        navigated = asyncio.Event()
+        def on_navigate(frame):
+            if frame == page.main_frame:
+                navigated.set()
+        page.on("framenavigated", on_navigate)
+
+        start = time.perf_counter()
+        cleared = False
+        try:
+            while time.perf_counter() - start < self.max_wait:
+                try:
+                    await asyncio.wait_for(navigated.wait(), self.poll)
+                except asyncio.TimeoutError:
+                    pass
+                if vendor == "unknown":
+                    cleared = navigated.is_set()
+                else:
+                    # Evaluating mid-navigation throws; treat that as "not yet"
+                    try:
+                        cleared = await page.evaluate(DETECT_JS) is None
+                    except Exception:
+                        cleared = False
+                if cleared:
+                    try:
+                        await page.wait_for_load_state("domcontentloaded", timeout=self.max_wait * 1000)
+                    except Exception:
+                        pass
+                    break
+                navigated.clear()
+        finally:
+            page.remove_listener("framenavigated", on_navigate)
+            self.seconds_waited += time.perf_counter() - start
+
+        if cleared:
+            self.cleared[vendor] += 1
+        return vendor, cleared
+
+    def summary(self):
+        total = sum(self.encountered.values())
+        if not total:
+            return f"Challenges: none in {self.pages} page loads."
+        vendors = ", ".join(f"{v} {n} ({self.cleared[v]} cleared)" for v, n in self.encountered.most_common())
+        return (f"Challenges: {total} of {self.pages} page loads ({100 * total / max(self.pages, 1):.0f}%): {vendors}; "
+                f"{self.seconds_waited:.0f}s spent waiting for clearance.")
+
+class DeferredRetryQueue:
+    """Domains whose challenge did not clear, retried later with exponential backoff.
+
+    Entries are (ready_at, domain, attempt); pop_ready() only hands out entries
+    whose backoff has elapsed, so the main pass never waits on them.
+    """
+
+    def __init__(self, max_retries=2, base_delay=30.0, max_delay=600.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._heap = []
+        self.deferred = 0
+        self.recovered = 0
+        self.abandoned = 0
+
+    def defer(self, domain, attempt):
+        """Schedules a retry; returns False once the domain is out of retries."""
+        if attempt > self.max_retries:
+            self.abandoned += 1
+            return False
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.8, 1.2)
+        heapq.heappush(self._heap, (time.monotonic() + delay, domain, attempt))
+        self.deferred += 1
+        print(f"  -> Deferring {domain} (retry {attempt}/{self.max_retries} in {delay:.0f}s)")
+        return True
+
+    def pop_ready(self):
+        """Returns (domain, attempt) for the next entry whose backoff has elapsed, or None."""
+        if self._heap and self._heap[0][0] <= time.monotonic():
+            _, domain, attempt = heapq.heappop(self._heap)
+            return domain, attempt
+        return None
+
+    def next_delay(self):
+        """Seconds until the earliest entry is ready, or None when the queue is empty."""
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def summary(self):
+        return (f"Deferred retries: {self.deferred} scheduled, {self.recovered} recovered, "
+                f"{self.abandoned} gave up after {self.max_retries} retries.")
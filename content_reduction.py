@@ -0,0 +1,151 @@
+import re
+
+# Kimi's tokenizer is not public; cl100k_base is a close enough proxy when tiktoken is installed
+_encoding = None
+_encoding_loaded = False
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Not installed, or the BPE file could not be downloaded
+            _encoding = None
+    return _encoding
+
+def count_tokens(text):
+    """Counts tokens with tiktoken if available, otherwise estimates about 4 characters per token."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+# Lines that are page chrome rather than content
+BOILERPLATE_PATTERNS = [re.compile(p, re.IGNORECASE) for p in [
+    r"^(?=.*\bcookies?\b)(?=.*\b(accept|consent|use|policy|settings|preferences)\b)",
+    r"^(accept|reject|decline|allow)( all)?( cookies)?$",
+    r"^(manage|cookie) (settings|preferences)$",
+    r"all rights reserved",
+    r"^(privacy( policy)?|terms( of (use|service))?|cookie policy|sitemap|careers|blog|faq|help)$",
+    r"^(home|menu|close|back|next|previous|more|share|search|skip to (main )?content)$",
+    r"^(log ?in|sign ?in|sign ?up|register|subscribe|get started|learn more|read more)$",
+    r"^(english|language|select language)$",
+    r"^©|^copyright\b",
+]]
+
+# (weight, pattern): what the risk assessment actually needs
+RELEVANCE_PATTERNS = [(w, re.compile(p, re.IGNORECASE)) for w, p in [
+    # Financial claims
+    (3, r"guarantee[ds]?|risk[- ]free|no risk|double your|passive income"),
+    (3, r"\d+(\.\d+)?\s?%\s*(daily|weekly|monthly|per (day|week|month)|returns?|profit|roi|apy|apr)"),
+    (2, r"\b(returns?|profits?|roi|yield|earn(ings)?|payouts?|withdraw(al)?s?|deposits?|bonus)\b"),
+    (2, r"\b(bitcoin|btc|ethereum|eth|crypto(currency)?|blockchain|tokens?|wallets?|forex|trading|invest(ment|ing|ors?)?|staking|mining)\b"),
+    (1, r"[$€£]\s?\d[\d,.]*|\d[\d,.]*\s?(usd|usdt|aud|eur|gbp)\b"),
+    (2, r"\b(bc1|[13])[a-km-zA-HJ-NP-Z1-9]{25,39}\b|\b0x[a-fA-F0-9]{40}\b"),
+    # Contact details
+    (3, r"[\w.+-]+@[\w-]+\.[\w.-]+"),
+    (2, r"\b(telegram|whatsapp|t\.me|wa\.me|discord|signal)\b"),
+    (1, r"\b(twitter|x\.com|facebook|instagram|linkedin|youtube|tiktok)\b"),
+    (2, r"\+?\d[\d\s().-]{7,}\d"),
+    (1, r"\b(contact|support|address|headquarters|office)\b"),
+    # Legal / registration
+    (3, r"\b(asic|fca|sec|cysec|finra|austrac|afsl|abn|acn|fsca|finma|mas)\b"),
+    (2, r"\b(licen[cs]ed?|regulated|registered|registration|authori[sz]ed|company (number|no))\b"),
+    (1, r"\b(ltd|llc|inc|pty|gmbh|limited|corp(oration)?)\b"),
+    (1, r"\b(disclaimer|risk warning|terms and conditions)\b"),
+]]
+
+def _normalize_line(line):
+    return " ".join(line.split())
+
+def _is_boilerplate(line):
+    # Only short lines are chrome; a long paragraph mentioning cookies is still content
+    return len(line) < 200 and any(p.search(line) for p in BOILERPLATE_PATTERNS)
+
+def _split_long(line, limit):
+    """Splits an overlong line (e.g. a page with no block structure) at word boundaries."""
+    words = line.split(" ")
+    piece = []
+    size = 0
+    for word in words:
+        piece.append(word)
+        size += len(word) + 1
+        if size >= limit:
+            yield " ".join(piece)
+            piece, size = [], 0
+    if piece:
+        yield " ".join(piece)
+
+def _chunks(lines, target_chars=400):
+    """Groups consecutive lines into paragraph-sized chunks so headings stay with their text."""
+    chunk = []
+    size = 0
+    pieces = (piece for line in lines for piece in _split_long(line, target_chars * 2))
+    for line in pieces:
+        chunk.append(line)
+        size += len(line)
+        if size >= target_chars:
+            yield "\n".join(chunk)
+            chunk, size = [], 0
+    if chunk:
+        yield "\n".join(chunk)
+
+def score_chunk(chunk):
+    return sum(w * len(p.findall(chunk)) for w, p in RELEVANCE_PATTERNS)
+
+def reduce_content(text, token_budget=4000):
+    """Reduces page text to the most relevant paragraphs that fit in token_budget.
+
+    Drops duplicate and boilerplate lines, scores the remaining paragraphs for
+    financial claims, contact details and legal/registration text, then packs
+    the best ones into the budget, keeping their original order.
+
+    Returns (reduced_text, original_tokens, reduced_tokens).
+    """
+    if not text:
+        return "", 0, 0
+    original_tokens = count_tokens(text)
+
+    seen = set()
+    lines = []
+    for raw in text.splitlines():
+        line = _normalize_line(raw)
+        key = line.lower()
+        if not line or key in seen or _is_boilerplate(line):
+            continue
+        seen.add(key)
+        lines.append(line)
+
+    cleaned = "\n".join(lines)
+    cleaned_tokens = count_tokens(cleaned)
+    if cleaned_tokens <= token_budget:
+        return cleaned, original_tokens, cleaned_tokens
+
+    chunks = list(_chunks(lines))
+    scored = []
+    for i, chunk in enumerate(chunks):
+        # The opening chunk usually carries the title and pitch, which the summary needs
+        bonus = 5 if i == 0 else 0
+        scored.append((score_chunk(chunk) + bonus, i, chunk, count_tokens(chunk)))
+
+    picked = []
+    used = 0
+    for score, i, chunk, tokens in sorted(scored, key=lambda c: (-c[0], c[1])):
+        if used + tokens > token_budget:
+            continue
+        picked.append((i, chunk))
+        used += tokens
+
+    if not picked:
+        # Even the best chunk alone is over budget; fall back to its leading part
+        best = max(scored, key=lambda c: (c[0], -c[1]))[2]
+        reduced = best[:token_budget * 4]
+        return reduced, original_tokens, count_tokens(reduced)
+
+    reduced = "\n".join(chunk for _, chunk in sorted(picked))
+    return reduced, original_tokens, count_tokens(reduced)
@@ -0,0 +1,197 @@
+import re
+import sqlite3
+import time
+from urllib.parse import urlsplit
+
+HOST_RE = re.compile(r"^(?:[a-z0-9](?:[a-z0-9-]{0,61}[a-z0-9])?\.)+(?:[a-z]{2,63}|xn--[a-z0-9-]{1,59})$")
+
+# Used when tldextract is not installed: the multi-label public suffixes we actually see in ads
+FALLBACK_SUFFIXES = {
+    "com.au", "net.au", "org.au", "edu.au", "gov.au", "asn.au", "id.au",
+    "co.uk", "org.uk", "me.uk", "ltd.uk", "plc.uk", "ac.uk", "gov.uk",
+    "co.nz", "net.nz", "org.nz", "co.za", "org.za", "co.in", "net.in", "org.in",
+    "com.sg", "com.my", "com.hk", "com.tw", "com.cn", "co.jp", "ne.jp", "or.jp", "co.kr",
+    "com.br", "com.mx", "com.ar", "com.co", "com.tr", "com.ua", "com.ng", "com.ph", "com.vn",
+    "co.id", "co.il", "co.th", "com.pk", "com.eg", "com.sa",
+    # Free hosting and site builders (private suffixes): every subdomain is a different site
+    "vercel.app", "netlify.app", "pages.dev", "workers.dev", "github.io", "gitlab.io", "web.app",
+    "firebaseapp.com", "herokuapp.com", "onrender.com", "fly.dev", "railway.app", "replit.app",
+    "glitch.me", "surge.sh", "webflow.io", "framer.website", "wixsite.com", "weebly.com",
+    "blogspot.com", "wordpress.com", "myshopify.com", "godaddysites.com", "square.site",
+    "carrd.co", "azurewebsites.net", "ngrok-free.app", "ngrok.io",
+}
+
+_extract = None
+_extract_loaded = False
+
+def _tldextract():
+    global _extract, _extract_loaded
+    if not _extract_loaded:
+        _extract_loaded = True
+        try:
+            import tldextract
+            # Use the bundled public suffix snapshot; never fetch it over the network. Private
+            # suffixes (vercel.app, github.io, ...) count, so each hosted site keeps its own row
+            _extract = tldextract.TLDExtract(suffix_list_urls=(), include_psl_private_domains=True)
+        except ImportError:
+            _extract = None
+    return _extract
+
+def normalize_host(raw):
+    """Lowercases, strips scheme/path/port and a leading www., and punycode-encodes IDNs.
+
+    Returns None if the value is not a valid hostname.
+    """
+    raw = (raw or "").strip().lower()
+    if not raw:
+        return None
+    if "://" not in raw:
+        raw = "//" + raw
+    try:
+        host = urlsplit(raw).hostname or ""
+    except ValueError:
+        return None
+    host = host.rstrip(".")
+    try:
+        host = host.encode("idna").decode("ascii")
+    except UnicodeError:
+        return None
+    if host.startswith("www."):
+        host = host[4:]
+    return host if HOST_RE.match(host) else None
+
+def registrable_domain(host):
+    """Returns the registrable domain (public suffix plus one label) of a normalized host.
+
+    Free-hosting suffixes are treated as public, so scam-one.vercel.app and
+    scam-two.vercel.app are two domains.
+    """
+    extract = _tldextract()
+    if extract is not None:
+        parts = extract(host)
+        if parts.domain and parts.suffix:
+            return f"{parts.domain}.{parts.suffix}"
+        return host
+    labels = host.split(".")
+    if len(labels) >= 3 and ".".join(labels[-2:]) in FALLBACK_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+class DomainStore:
+    """SQLite store of advertiser domains shared by the scraper and the scanner.
+
+    Domains are keyed on their registrable domain, so www.x.com, X.com and
+    x.com/path are one row, while sites on shared hosting (a.github.io,
+    b.github.io) are not. Each row keeps the host it was first seen as (which
+    the scanner visits), first/last-seen timestamps and a scan status; the
+    sightings table records which query and region found it.
+
+    New sightings are buffered and written with one bulk upsert per flush().
+    """
+
+    def __init__(self, path="domains.sqlite", flush_every=500):
+        self.path = path
+        self.flush_every = flush_every
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS domains (
+                domain TEXT PRIMARY KEY,
+                host TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                scan_status TEXT NOT NULL DEFAULT 'pending',
+                scanned_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS domains_status ON domains(scan_status, first_seen);
+            CREATE TABLE IF NOT EXISTS sightings (
+                domain TEXT NOT NULL,
+                query TEXT NOT NULL,
+                region TEXT NOT NULL,
+                first_seen REAL NOT NULL,
+                last_seen REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 1,
+                PRIMARY KEY (domain, query, region)
+            );
+            """
+        )
+        self._conn.commit()
+        self._pending = []
+        self._pending_domains = set()
+
+    def is_known(self, domain):
+        if domain in self._pending_domains:
+            return True
+        return self._conn.execute("SELECT 1 FROM domains WHERE domain = ?", (domain,)).fetchone() is not None
+
+    def add(self, raw, query="", region=""):
+        """Buffers a sighting; returns the normalized domain if it has never been seen, else None."""
+        host = normalize_host(raw)
+        if host is None:
+            return None
+        domain = registrable_domain(host)
+        is_new = not self.is_known(domain)
+        self._pending.append((domain, host, query, region, time.time()))
+        self._pending_domains.add(domain)
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+        return domain if is_new else None
+
+    def add_many(self, raws, query="", region=""):
+        """Adds several sightings and flushes; returns the newly seen domains."""
+        new = [d for d in (self.add(raw, query, region) for raw in raws) if d]
+        self.flush()
+        return new
+
+    def flush(self):
+        if not self._pending:
+            return
+        self._conn.executemany(
+            """INSERT INTO domains (domain, host, first_seen, last_seen) VALUES (?, ?, ?, ?)
+               ON CONFLICT(domain) DO UPDATE SET last_seen = excluded.last_seen""",
+            [(domain, host, seen, seen) for domain, host, _, _, seen in self._pending],
+        )
+        self._conn.executemany(
+            """INSERT INTO sightings (domain, query, region, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(domain, query, region) DO UPDATE SET last_seen = excluded.last_seen, hits = hits + 1""",
+            [(domain, query, region, seen, seen) for domain, _, query, region, seen in self._pending],
+        )
+        self._conn.commit()
+        self._pending = []
+        self._pending_domains = set()
+
+    def hosts_to_scan(self, include_done=False, dead_ttl=None):
+        """Returns the hosts still to be scanned (or all of them), oldest discoveries first.
+
+        Hosts marked 'dead' by the liveness prefilter are left out until dead_ttl
+        seconds after they were found dead (for good if dead_ttl is None).
+        """
+        self.flush()
+        if include_done:
+            rows = self._conn.execute("SELECT host FROM domains ORDER BY first_seen")
+        else:
+            dead_since = 0 if dead_ttl is None else time.time() - dead_ttl
+            rows = self._conn.execute(
+                "SELECT host FROM domains WHERE scan_status != 'done' "
+                "AND NOT (scan_status = 'dead' AND scanned_at > ?) ORDER BY first_seen",
+                (dead_since,),
+            )
+        return [host for (host,) in rows]
+
+    def set_status(self, raw, status):
+        """Records the scan outcome ('done', 'failed' or 'dead') for a host or domain."""
+        host = normalize_host(raw)
+        if host is None:
+            return
+        self._conn.execute("UPDATE domains SET scan_status = ?, scanned_at = ? WHERE domain = ?",
+                           (status, time.time(), registrable_domain(host)))
+        self._conn.commit()
+
+    def count(self):
+        self.flush()
+        (n,) = self._conn.execute("SELECT COUNT(*) FROM domains").fetchone()
+        return n
+
+    def close(self):
+        self.flush()
+        self._conn.close()
@@ -0,0 +1,66 @@
+import asyncio
+
+# Elements whose text is boilerplate or code rather than page content
+STRIP_TAGS = ["script", "style", "nav", "footer", "header", "noscript"]
+
+# Runs inside the page: the page is closed right after, so mutating the live DOM is fine
+IN_PAGE_JS = """
+(tags) => {
+    for (const el of document.querySelectorAll(tags.join(','))) el.remove();
+    const body = document.body ? document.body.innerText : '';
+    return (document.title || '') + '\\n' + body;
+}
+"""
+
+def normalize_whitespace(text):
+    """Collapses runs of spaces within lines and drops blank lines, keeping block boundaries."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+def extract_bs4(html):
+    """Original extractor: BeautifulSoup with the pure-Python html.parser."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for el in soup(STRIP_TAGS):
+        el.decompose()
+    return soup.get_text(separator='\n', strip=True)
+
+def extract_lxml(html):
+    """lxml-based extractor (optional dependency: pip install lxml)."""
+    from lxml import html as lxml_html
+    if not html.strip():
+        return ""
+    tree = lxml_html.fromstring(html)
+    for el in tree.xpath("|".join(f"//{tag}" for tag in STRIP_TAGS)):
+        el.drop_tree()
+    # //text() skips comment nodes, matching BeautifulSoup's get_text()
+    return "\n".join(t.strip() for t in tree.xpath("//text()") if t.strip())
+
+def extract_selectolax(html):
+    """selectolax (lexbor backend) extractor (optional dependency: pip install selectolax)."""
+    from selectolax.lexbor import LexborHTMLParser
+    tree = LexborHTMLParser(html)
+    tree.strip_tags(STRIP_TAGS)
+    if tree.root is None:
+        return ""
+    return tree.root.text(separator='\n', strip=True)
+
+# Extractors that work on serialized HTML (run off the event loop)
+HTML_EXTRACTORS = {
+    "bs4": extract_bs4,
+    "lxml": extract_lxml,
+    "selectolax": extract_selectolax,
+}
+
+# "dom" strips tags and reads innerText inside the browser, skipping page.content() entirely
+EXTRACTOR_NAMES = ["dom"] + list(HTML_EXTRACTORS)
+
+async def extract_text(page, method="dom"):
+    """Returns the visible text of a loaded page using the chosen extractor."""
+    if method == "dom":
+        return normalize_whitespace(await page.evaluate(IN_PAGE_JS, STRIP_TAGS))
+
+    html = await page.content()
+    # Parsing a large landing page takes real CPU time, so keep it off the event loop
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, HTML_EXTRACTORS[method], html)
@@ -0,0 +1,143 @@
+import asyncio
+import re
+from collections import Counter
+
+from challenges import CHALLENGE_MARKERS, CHALLENGE_STATUSES
+from extractors import HTML_EXTRACTORS
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+# Empty mount points of client-rendered apps, and "you need JavaScript" notices
+JS_APP_RE = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt|svelte)[\"'][^>]*>\s*</div>"
+    r"|<noscript[^>]*>[^<]*(?:enable|requires?) javascript",
+    re.IGNORECASE,
+)
+
+# Fastest available HTML extractor first; the browser's "dom" extractor has no HTTP equivalent
+PREFERRED_EXTRACTORS = ("selectolax", "lxml", "bs4")
+
+def pick_html_extractor(method):
+    """Returns an HTML extractor function for method, or the fastest installed one for "dom"."""
+    if method in HTML_EXTRACTORS:
+        return HTML_EXTRACTORS[method]
+    for name in PREFERRED_EXTRACTORS:
+        try:
+            HTML_EXTRACTORS[name]("<p></p>")
+            return HTML_EXTRACTORS[name]
+        except ImportError:
+            continue
+    raise ImportError("No HTML extractor available; install selectolax, lxml or beautifulsoup4")
+
+def escalation_reason(status, content_type, html, text, min_chars=200, js_min_words=60):
+    """Returns why a plain HTTP response needs the browser instead, or None if its text is usable."""
+    if status in CHALLENGE_STATUSES:
+        return f"status {status}"
+    if status >= 400:
+        return "http error"
+    if "html" not in content_type and "text/plain" not in content_type:
+        return "non-html"
+    lowered = html[:20000].lower()
+    if any(marker in lowered for marker in CHALLENGE_MARKERS):
+        return "challenge"
+    if len(text) < min_chars:
+        return "empty"
+    if JS_APP_RE.search(html) and len(text.split()) < js_min_words:
+        return "js-rendered"
+    return None
+
+class HttpFetcher:
+    """First fetch tier: a pooled async HTTP GET that skips the browser for static pages.
+
+    fetch() returns the page text, or None when the page should be escalated to
+    Playwright (challenges, near-empty or client-rendered pages, errors). SOCKS
+    proxies such as Tor need the socks extra: pip install "httpx[socks]".
+    A per-call proxy (e.g. a worker's Tor circuit) gets its own pooled client.
+    """
+
+    def __init__(self, proxy=None, timeout=15.0, max_connections=20, extractor="dom", max_bytes=5_000_000):
+        self.max_bytes = max_bytes
+        self.extract = pick_html_extractor(extractor)
+        self.proxy = proxy
+        # Only loaded for --fetch-mode tiered
+        import httpx
+
+        self._httpx = httpx
+        self.client_options = dict(
+            timeout=timeout,
+            # Same trust model as the browser context (ignore_https_errors=True)
+            verify=False,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "en-US,en;q=0.9",
+            },
+        )
+        self._clients = {}
+        # Fail at startup, not on the first domain, if the proxy needs a missing extra
+        self._client(proxy)
+        self.tiers = Counter()
+        self.escalations = Counter()
+
+    def _client(self, proxy):
+        if proxy not in self._clients:
+            self._clients[proxy] = self._httpx.AsyncClient(proxy=proxy, **self.client_options)
+        return self._clients[proxy]
+
+    async def fetch(self, url, proxy=None, fetch_info=None):
+        target_url = url if url.startswith("http") else f"https://{url}"
+        client = self._client(proxy or self.proxy)
+        try:
+            async with client.stream("GET", target_url) as response:
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) >= self.max_bytes:
+                        break
+                status = response.status_code
+                content_type = response.headers.get("content-type", "").lower()
+                encoding = response.encoding or "utf-8"
+        except (self._httpx.HTTPError, OSError) as e:
+            self.escalations["error"] += 1
+            print(f"  -> HTTP fetch of {url} failed ({type(e).__name__}), escalating to browser")
+            return None
+
+        if fetch_info is not None:
+            fetch_info["http_status"] = status
+            fetch_info["http_bytes"] = len(body)
+        html = body.decode(encoding, errors="replace")
+        # Parse off the event loop, as the browser tier does for HTML extractors
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, self.extract, html) if "html" in content_type else html.strip()
+
+        reason = escalation_reason(status, content_type, html, text)
+        if reason:
+            self.escalations[reason] += 1
+            print(f"  -> HTTP tier skipped {url} ({reason}), escalating to browser")
+            return None
+        print(f"  -> Served {url} over plain HTTP ({len(body) // 1024} KB)")
+        return text
+
+    def record(self, tier):
+        """Counts which tier produced a domain's content: "http", "browser" or "failed"."""
+        self.tiers[tier] += 1
+
+    def summary(self):
+        total = sum(self.tiers.values()) or 1
+        parts = [f"{tier} {100 * self.tiers[tier] / total:.0f}% ({self.tiers[tier]})" for tier in ("http", "browser", "failed")]
+        line = "Fetch tiers: " + ", ".join(parts)
+        if self.escalations:
+            line += "\nEscalated to browser: " + ", ".join(f"{reason} {n}" for reason, n in self.escalations.most_common())
+        return line
+
+    async def discard(self, proxy):
+        """Closes the pooled client for a proxy that will not be used again (a rotated circuit)."""
+        client = self._clients.pop(proxy, None)
+        if client:
+            await client.aclose()
+
+    async def close(self):
+        for client in self._clients.values():
+            await client.aclose()
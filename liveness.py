@@ -0,0 +1,122 @@
+"""DNS + TCP liveness prefilter for the scanner's domain list.
+
+Resolves every domain and probes TCP 443/80 concurrently with short timeouts,
+so dead and parked domains are dropped before they cost a 60-second page.goto.
+
+    python liveness.py example.com allcryptonews.net
+"""
+import argparse
+import asyncio
+import socket
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urlsplit
+
+ALIVE = "alive"
+NXDOMAIN = "nxdomain"
+DNS_ERROR = "dns-error"
+REFUSED = "refused"
+UNREACHABLE = "unreachable"
+
+# Permanent failures are skipped; transient ones are still scanned, after the live domains
+SKIP_STATUSES = (NXDOMAIN, REFUSED)
+DEPRIORITIZE_STATUSES = (DNS_ERROR, UNREACHABLE)
+
+PROBE_PORTS = (443, 80)
+
+def host_of(domain):
+    if "://" in domain:
+        return urlsplit(domain).hostname or domain
+    return domain.split("/", 1)[0]
+
+async def resolve(host, timeout, executor=None):
+    """Returns (addresses, None) or ([], status) for a failed lookup.
+
+    getaddrinfo blocks a thread per lookup; pass an executor with one thread per
+    concurrent probe, or lookups queue for a thread and time out while waiting.
+    """
+    loop = asyncio.get_running_loop()
+    lookup = partial(socket.getaddrinfo, host, None, type=socket.SOCK_STREAM)
+    try:
+        infos = await asyncio.wait_for(loop.run_in_executor(executor, lookup), timeout)
+    except asyncio.TimeoutError:
+        return [], DNS_ERROR
+    except socket.gaierror as e:
+        if e.errno in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)):
+            return [], NXDOMAIN
+        return [], DNS_ERROR
+    return list(dict.fromkeys(info[4][0] for info in infos)), None
+
+async def probe_port(address, port, timeout):
+    """Returns ALIVE, REFUSED or UNREACHABLE for one TCP connect."""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(address, port), timeout)
+    except ConnectionRefusedError:
+        return REFUSED
+    except (asyncio.TimeoutError, OSError):
+        return UNREACHABLE
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return ALIVE
+
+async def probe_domain(domain, dns_timeout=5.0, connect_timeout=5.0, executor=None):
+    """Classifies a domain as alive, nxdomain, dns-error, refused or unreachable."""
+    addresses, status = await resolve(host_of(domain), dns_timeout, executor)
+    if status:
+        return status
+    # Only the first address is probed; one live port is enough
+    results = await asyncio.gather(*(probe_port(addresses[0], port, connect_timeout) for port in PROBE_PORTS))
+    if ALIVE in results:
+        return ALIVE
+    return REFUSED if all(r == REFUSED for r in results) else UNREACHABLE
+
+async def check_liveness(domains, concurrency=100, dns_timeout=5.0, connect_timeout=5.0):
+    """Probes all domains concurrently; returns {domain: status}."""
+    semaphore = asyncio.Semaphore(concurrency)
+    # The default executor has min(32, CPUs + 4) threads, far fewer than the probes in flight
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="liveness-dns")
+
+    async def check(domain):
+        async with semaphore:
+            return domain, await probe_domain(domain, dns_timeout, connect_timeout, executor)
+
+    try:
+        return dict(await asyncio.gather(*(check(domain) for domain in domains)))
+    finally:
+        # Lookups that timed out may still be running; don't wait for them
+        executor.shutdown(wait=False)
+
+def partition(domains, statuses):
+    """Splits domains into (to_scan, skipped): live ones first, then transient failures.
+
+    skipped is a list of (domain, status) for permanently dead domains.
+    """
+    alive = [d for d in domains if statuses.get(d, ALIVE) not in SKIP_STATUSES + DEPRIORITIZE_STATUSES]
+    later = [d for d in domains if statuses.get(d) in DEPRIORITIZE_STATUSES]
+    skipped = [(d, statuses[d]) for d in domains if statuses.get(d) in SKIP_STATUSES]
+    return alive + later, skipped
+
+def summary(statuses):
+    counts = Counter(statuses.values())
+    return "Liveness: " + ", ".join(f"{status} {n}" for status, n in counts.most_common())
+
+def main():
+    parser = argparse.ArgumentParser(description="Check which domains resolve and accept connections")
+    parser.add_argument("domains", nargs="+")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    statuses = asyncio.run(check_liveness(args.domains, args.concurrency, args.timeout, args.timeout))
+    for domain, status in statuses.items():
+        print(f"{status:<12} {domain}")
+    print(f"{summary(statuses)} ({time.perf_counter() - start:.1f}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import asyncio
+import random
+import time
+
+from content_reduction import count_tokens
+from timing import NULL_TRACE
+
+DEFAULT_BASE_URL = "https://api.moonshot.ai/v1"
+
+class TokenBucket:
+    """Async token bucket refilled continuously at rate_per_minute, holding at most one minute's worth."""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = float(rate_per_minute)
+        self.rate = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount=1):
+        # A single request larger than the bucket would wait forever, so cap it
+        amount = min(float(amount), self.capacity)
+        # Holding the lock while sleeping keeps waiters first-come first-served
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+class RateLimiter:
+    """Combined requests/min and tokens/min limiter; a limit of None or 0 disables it."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    async def acquire(self, tokens):
+        if self.requests:
+            await self.requests.acquire(1)
+        if self.tokens:
+            await self.tokens.acquire(tokens)
+
+def estimate_tokens(messages, max_output_tokens=1024):
+    """Token estimate for the tokens/min budget: the prompt plus the maximum expected reply."""
+    return sum(count_tokens(m["content"]) for m in messages) + max_output_tokens
+
+def _retry_after(error):
+    """Returns the server's Retry-After delay in seconds, if it sent one."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def _is_retryable(error):
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+class LLMBackend:
+    """Async chat-completion backend with a shared connection pool, retries and rate limiting.
+
+    Retries 429s, 5xx responses, timeouts and connection errors with exponential
+    backoff and full jitter (honouring Retry-After when the server sends it).
+    Works against any OpenAI-compatible base_url, including a local fake server.
+    """
+
+    def __init__(self, api_key, model, base_url=DEFAULT_BASE_URL, timeout=60.0, max_retries=5,
+                 max_connections=20, requests_per_minute=None, tokens_per_minute=None,
+                 backoff_base=1.0, backoff_cap=60.0):
+        self.model = model
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.retries = 0
+        # Real usage as reported by the API
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        # Imported here so importing scanner (for its parser or helpers) does not load the SDK
+        import httpx
+        from openai import AsyncOpenAI
+
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+        )
+        # Retries are handled here so they also go through the rate limiter
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout,
+                                  max_retries=0, http_client=self.http_client)
+
+    async def complete(self, messages, temperature=0.3, max_tokens=None, trace=None):
+        """Returns the completion text, raising the last API error once retries are exhausted.
+
+        Retries and token usage are also counted on trace, if one is given.
+        """
+        trace = trace or NULL_TRACE
+        kwargs = {"model": self.model, "messages": messages, "temperature": temperature}
+        if max_tokens:
+            kwargs["max_tokens"] = max_tokens
+        estimate = estimate_tokens(messages, max_tokens or 1024)
+
+        attempt = 0
+        while True:
+            await self.limiter.acquire(estimate)
+            try:
+                completion = await self.client.chat.completions.create(**kwargs)
+                if completion.usage:
+                    self.prompt_tokens += completion.usage.prompt_tokens or 0
+                    self.completion_tokens += completion.usage.completion_tokens or 0
+                    trace.count("prompt_tokens", completion.usage.prompt_tokens or 0)
+                    trace.count("completion_tokens", completion.usage.completion_tokens or 0)
+                return completion.choices[0].message.content
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                attempt += 1
+                self.retries += 1
+                trace.count("llm_retries")
+                print(f"  -> LLM call failed ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    async def verify(self):
+        """Checks the API key by listing models."""
+        await self.client.models.list()
+
+    async def close(self):
+        await self.client.close()
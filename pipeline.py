@@ -0,0 +1,100 @@
+"""Scrape and scan in one process: domains found by the scraper are scanned as they arrive.
+
+    python pipeline.py "Bitcoin" "Ethereum" --region AU,GB --max-pages 3 --concurrency 4
+
+Accepts the scraper's query/region options and all of scanner.py's options.
+The first Ctrl-C stops scraping and lets the scanner finish every domain
+already queued; a second Ctrl-C stops the scanner too (the journal lets the
+next run pick the interrupted domains back up).
+"""
+import asyncio
+import signal
+import time
+import traceback
+
+import scanner
+from domain_store import DomainStore
+from scraper import add_scrape_arguments, resolve_scrape_args, scrape_ads_transparency
+from timing import Metrics
+
+async def run_pipeline(args, queries, regions, wait_caps):
+    # Bounded, so a slow LLM makes the scraper wait instead of queueing without limit
+    queue = asyncio.Queue(maxsize=args.queue_size)
+    store = None if args.no_db else DomainStore(args.db)
+    # Scraper jobs share the scanner's trace file; records are told apart by "kind"
+    scrape_metrics = Metrics("scraper", trace_path=args.trace_file or None)
+    started = time.monotonic()
+
+    scrape_task = asyncio.create_task(scrape_ads_transparency(
+        queries, regions, args.max_pages, headless=not args.visible, output_file=args.output,
+        extraction=args.extraction, workers=args.workers, wait_caps=wait_caps, store=store, domain_queue=queue,
+        metrics=scrape_metrics,
+    ))
+    scan_task = asyncio.create_task(scanner.main(args, source=queue, store=store))
+
+    interrupts = 0
+    def on_interrupt():
+        nonlocal interrupts
+        interrupts += 1
+        if interrupts == 1 and not scrape_task.done():
+            print("\nStopping the scraper; finishing domains already queued (Ctrl-C again to stop now)...")
+            scrape_task.cancel()
+        else:
+            print("\nStopping the scanner...")
+            scan_task.cancel()
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, on_interrupt)
+    except NotImplementedError:
+        # Windows: Ctrl-C raises KeyboardInterrupt in asyncio.run instead
+        pass
+
+    try:
+        done, _ = await asyncio.wait({scrape_task, scan_task}, return_when=asyncio.FIRST_COMPLETED)
+        if scrape_task in done:
+            try:
+                scrape_task.result()
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                print(f"Scraper failed: {e}")
+                traceback.print_exc()
+            print(f"Scraping finished after {time.monotonic() - started:.0f}s; draining the scan queue...")
+            # The sentinel waits behind the queued domains, so they are all scanned first
+            if not scan_task.done():
+                await queue.put(None)
+        else:
+            # The scanner gave up (e.g. bad API key); nothing would consume further domains
+            scrape_task.cancel()
+            await asyncio.gather(scrape_task, return_exceptions=True)
+        try:
+            await scan_task
+        except asyncio.CancelledError:
+            print("Scanner stopped before the queue was drained.")
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except NotImplementedError:
+            pass
+        scrape_metrics.close()
+        if store:
+            store.close()
+    print(f"Pipeline finished in {time.monotonic() - started:.0f}s.")
+
+def main():
+    parser = scanner.build_parser("Scrape the Ads Transparency Center and scan new domains as they are found")
+    add_scrape_arguments(parser)
+    parser.add_argument("--output", default="crypto_domains.txt", help="File the scraper appends new domains to (default: %(default)s)")
+    parser.add_argument("--queue-size", type=int, default=50, help="Domains that may wait for the scanner before the scraper pauses (default: 50)")
+    args = parser.parse_args()
+    queries, regions, wait_caps = resolve_scrape_args(args)
+    scanner.init_env()
+
+    try:
+        asyncio.run(run_pipeline(args, queries, regions, wait_caps))
+    except KeyboardInterrupt:
+        print("\nStopped by user.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Submits domains to a running scan_daemon.py and prints each verdict as it arrives.
+
+    python scan_client.py suspicious-site.com other.io
+    python scan_client.py --file shortlist.txt --timeout 600
+    python scan_client.py --status
+
+Only the standard library is imported, so this starts instantly; the browser,
+LLM client and caches live in the daemon.
+"""
+import argparse
+import json
+import socket
+import sys
+
+DEFAULT_PORT = 8790
+
+def request(host, port, payload, timeout=None):
+    """Sends one JSON request and yields the JSON lines of the reply."""
+    with socket.create_connection((host, port), timeout=10) as sock:
+        sock.settimeout(timeout)
+        sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+        with sock.makefile("r", encoding="utf-8") as reply:
+            for line in reply:
+                yield json.loads(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Scan domains with a running scan_daemon.py")
+    parser.add_argument("domains", nargs="*", help="Domains to scan")
+    parser.add_argument("--file", help="File with one domain per line")
+    parser.add_argument("--host", default="127.0.0.1", help="Daemon address (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Daemon port (default: %(default)s)")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds to wait for results (default: %(default)s)")
+    parser.add_argument("--status", action="store_true", help="Show the daemon's queue and counters instead")
+    parser.add_argument("--json", action="store_true", help="Print the raw JSON lines")
+    args = parser.parse_args()
+
+    domains = list(args.domains)
+    if args.file:
+        with open(args.file, "r", encoding="utf-8") as f:
+            domains.extend(line.strip() for line in f if line.strip())
+    if not domains and not args.status:
+        parser.error("give at least one domain, --file or --status")
+
+    payload = {"status": True} if args.status else {"domains": domains, "timeout": args.timeout}
+    failed = 0
+    try:
+        # A little slack so the daemon's own timeout answers first
+        for item in request(args.host, args.port, payload, args.timeout + 30):
+            if args.json or args.status:
+                print(json.dumps(item))
+            elif item.get("done"):
+                break
+            elif "domain" not in item:
+                print(f"Daemon error: {item.get('error')}")
+                failed += 1
+            elif item.get("result"):
+                print(item["result"], end="")
+            else:
+                print(f"--- Domain: {item.get('domain')} ---\n{item.get('status')}: {item.get('error')}\n")
+            if item.get("status") not in (None, "done"):
+                failed += 1
+    except ConnectionRefusedError:
+        print(f"No scan daemon on {args.host}:{args.port}; start one with: python scan_daemon.py")
+        sys.exit(2)
+    except socket.timeout:
+        print("Timed out waiting for the daemon.")
+        sys.exit(1)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
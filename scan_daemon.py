@@ -0,0 +1,181 @@
+"""Long-running scanner that keeps the browser, LLM client and caches warm.
+
+    python scan_daemon.py --concurrency 4            # start once
+    python scan_client.py suspicious-site.com        # results in seconds
+
+Starts the scanner once (API key check, Tor detection, Chromium launch) and
+then scans whatever domains clients submit over a local TCP socket, using
+the same streaming path as pipeline.py. Accepts all of scanner.py's options.
+
+Protocol: one JSON request per connection, answered with JSON lines.
+
+    {"domains": ["a.com", "b.io"], "timeout": 300}
+        -> {"domain": "a.com", "status": "done", "error": null, "result": "--- Domain: a.com ---\\n..."}
+           ... one line per domain as it finishes, in completion order, then {"done": true}
+    {"status": true}
+        -> {"uptime_s": ..., "queued": ..., "in_progress": ..., "scanned": ...}
+
+Results are also written to domain_analysis.txt, the journal and the domain
+store, exactly as in a batch run. Ctrl-C (or SIGTERM) finishes the domains
+already submitted and shuts down.
+"""
+import asyncio
+import json
+import signal
+import time
+import traceback
+
+import scanner
+from domain_store import DomainStore, normalize_host
+
+DEFAULT_PORT = 8790
+
+class ScanService:
+    """Feeds submitted domains to a running scan and hands each result back to whoever asked for it."""
+
+    def __init__(self, queue_size=100, store=None):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.store = store
+        self.waiters = {}
+        self.scanned = 0
+        self.started = time.monotonic()
+
+    def on_result(self, domain, block, status, error):
+        self.scanned += 1
+        result = {"domain": domain, "status": status, "error": error, "result": block}
+        for future in self.waiters.pop(domain, []):
+            if not future.done():
+                future.set_result(result)
+
+    async def submit(self, domains):
+        """Queues each domain once (a domain already being scanned is shared) and returns {domain: future}."""
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for raw in domains:
+            domain = normalize_host(raw) or raw.strip()
+            if not domain or domain in futures:
+                continue
+            if self.store:
+                # Recorded like scraped domains, so their scan status is tracked too
+                self.store.add(raw)
+            future = loop.create_future()
+            futures[domain] = future
+            if domain not in self.waiters:
+                self.waiters[domain] = [future]
+                await self.queue.put(domain)
+            else:
+                self.waiters[domain].append(future)
+        if self.store:
+            self.store.flush()
+        return futures
+
+    def fail_pending(self, error):
+        """Answers every waiting client once the scanner has stopped."""
+        for domain, futures in self.waiters.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result({"domain": domain, "status": "failed", "error": error, "result": None})
+        self.waiters.clear()
+
+    def status(self):
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "queued": self.queue.qsize(),
+            "in_progress": len(self.waiters),
+            "scanned": self.scanned,
+        }
+
+    async def handle(self, reader, writer):
+        def send(obj):
+            writer.write((json.dumps(obj) + "\n").encode("utf-8"))
+
+        try:
+            line = await reader.readline()
+            try:
+                request = json.loads(line or b"{}")
+            except json.JSONDecodeError as e:
+                send({"error": f"bad request: {e}"})
+                return
+            if request.get("status"):
+                send(self.status())
+                return
+            domains = request.get("domains") or []
+            futures = await self.submit(domains)
+            print(f"[daemon] {len(futures)} domains submitted: {', '.join(futures)}")
+            pending = set(futures.values())
+            deadline = time.monotonic() + float(request.get("timeout", 300))
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    send(future.result())
+                await writer.drain()
+            for domain, future in futures.items():
+                # Still scanning; its result will be in the output file and journal
+                if future in pending:
+                    send({"domain": domain, "status": "timeout", "error": "still scanning", "result": None})
+            send({"done": True})
+        except ConnectionError:
+            pass
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+async def serve(args):
+    store = None if args.no_db else DomainStore(args.db)
+    service = ScanService(args.queue_size, store)
+    server = await asyncio.start_server(service.handle, args.host, args.port)
+    print(f"Scan daemon listening on {args.host}:{args.port}")
+
+    # Nothing but submitted domains: the scan runs until the None sentinel
+    scan_task = asyncio.create_task(scanner.main(args, source=service.queue, store=store, domains=[],
+                                                 on_result=service.on_result))
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            pass
+
+    try:
+        stop_task = asyncio.create_task(stop.wait())
+        await asyncio.wait({scan_task, stop_task}, return_when=asyncio.FIRST_COMPLETED)
+        stop_task.cancel()
+        if not scan_task.done():
+            print("\nShutting down; finishing submitted domains...")
+            server.close()
+            await service.queue.put(None)
+        try:
+            await scan_task
+        except Exception as e:
+            print(f"Scanner failed: {e}")
+            traceback.print_exc()
+    finally:
+        service.fail_pending("scanner stopped")
+        server.close()
+        await server.wait_closed()
+        if store:
+            store.close()
+
+def main():
+    parser = scanner.build_parser("Keep a warm scanner running and scan domains submitted by scan_client.py")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on (default: %(default)s)")
+    parser.add_argument("--queue-size", type=int, default=100, help="Submitted domains that may wait for a worker before clients block (default: 100)")
+    args = parser.parse_args()
+    scanner.init_env()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\nStopped by user.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import json
+import os
+from datetime import datetime, timezone
+
+def _now():
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+class ScanJournal:
+    """JSONL checkpoint journal with one record per domain.
+
+    Each record holds the domain's status ("started", "done", "failed" or "dead"), the
+    number of attempts, start/finish timestamps and the error class of the last
+    failure. Records are appended as the scan progresses, so the latest line for
+    a domain wins; compact() rewrites the file down to one line per domain.
+
+    "dead" marks a domain the liveness prefilter found gone (NXDOMAIN or
+    refused). It is not retried until dead_ttl seconds have passed, or ever if
+    dead_ttl is None.
+    """
+
+    def __init__(self, path, max_attempts=3, dead_ttl=None):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.dead_ttl = dead_ttl
+        self.records = {}
+        self._load()
+        self.compact()
+        self._f = open(self.path, "a", encoding="utf-8")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                self.records[record["domain"]] = record
+
+    def compact(self):
+        """Rewrites the journal with only the latest record for each domain."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in self.records.values():
+                f.write(json.dumps(record) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def _still_dead(self, record):
+        if self.dead_ttl is None or not record.get("finished_at"):
+            return True
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(record["finished_at"])
+        return age.total_seconds() < self.dead_ttl
+
+    def pending(self, domains):
+        """Filters domains down to those not completed, not recently dead and still within the retry budget."""
+        todo = []
+        done = dead = exhausted = retried = 0
+        for domain in domains:
+            record = self.records.get(domain)
+            if record is None:
+                todo.append(domain)
+            elif record["status"] == "done":
+                done += 1
+            elif record["status"] == "dead" and self._still_dead(record):
+                dead += 1
+            elif record["status"] == "dead":
+                # Rechecked from scratch, with a fresh retry budget
+                retried += 1
+                todo.append(domain)
+            elif record["attempts"] >= self.max_attempts:
+                exhausted += 1
+            else:
+                retried += 1
+                todo.append(domain)
+        if done or dead or exhausted or retried:
+            print(f"Journal: skipping {done} completed, {dead} dead and {exhausted} out-of-retries domains, "
+                  f"retrying {retried} failed or incomplete.")
+        return todo
+
+    def _append(self, record):
+        self.records[record["domain"]] = record
+        self._f.write(json.dumps(record) + "\n")
+        self._f.flush()
+
+    def start(self, domain):
+        previous = self.records.get(domain, {})
+        attempts = 0 if previous.get("status") == "dead" else previous.get("attempts", 0)
+        self._append({
+            "domain": domain,
+            "status": "started",
+            "attempts": attempts + 1,
+            "started_at": _now(),
+            "finished_at": None,
+            "error": None,
+        })
+
+    def finish(self, domain, status, error=None):
+        record = dict(self.records.get(domain) or {"domain": domain, "attempts": 1, "started_at": None})
+        record.update(status=status, finished_at=_now(), error=error)
+        self._append(record)
+
+    def close(self):
+        self._f.close()
+        self.compact()
@@ -1,58 +1,82 @@
 import asyncio
+import argparse
+import collections
+import itertools
+import re
 import os
 import sys
+import time
 import traceback
-import socket
-from playwright.async_api import async_playwright
-from playwright_stealth import Stealth
-from openai import OpenAI
-from bs4 import BeautifulSoup
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv(override=True)
-
-API_KEY = os.getenv("MOONSHOT_API_KEY")
-# API_KEY = "sk-tjtcxB4I80RFfhPVqaL1Ot5tQNw4nC7PBF88SWkMrG4C1bjV"
-
-if not API_KEY or API_KEY == "your_api_key_here":
-    print("Error: MOONSHOT_API_KEY not found or not set in .env file.")
-    print("Please edit .env and add your actual API key.")
-    sys.exit(1)
-
-# Initialize OpenAI client for Moonshot AI
-try:
-    client = OpenAI(
-        api_key=API_KEY,
-        base_url="https://api.moonshot.ai/v1",
-    )
-except Exception as e:
-    print(f"Error initializing OpenAI client: {e}")
-    sys.exit(1)
+from analysis_cache import AnalysisCache
+from batch_analysis import BatchAnalyzer
+from browser_pool import BrowserPool
+from challenges import ChallengeHandler, DeferredRetryQueue
+from content_reduction import reduce_content
+from domain_store import DomainStore
+from extractors import EXTRACTOR_NAMES, extract_text
+from http_fetcher import HttpFetcher
+from liveness import check_liveness, partition, summary as liveness_summary
+from llm_backend import LLMBackend, DEFAULT_BASE_URL
+from near_duplicates import NearDuplicateIndex
+from scan_journal import ScanJournal
+from timing import Metrics, NULL_TRACE
+from triage import HIGH, SKIP, Triager
+from tor_pool import CircuitPool, detect_endpoints, parse_endpoint
+from resource_policy import ResourcePolicy, DEFAULT_BLOCK_HOSTS, DEFAULT_BLOCK_TYPES
 
-def check_tor_proxy():
-    """Checks if Tor proxy is available on port 9150 (Tor Browser) or 9050 (Standalone)."""
-    for port in [9150, 9050]:
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1)
-            result = sock.connect_ex(('127.0.0.1', port))
-            sock.close()
-            if result == 0:
-                return f"socks5://127.0.0.1:{port}"
-        except:
-            pass
-    return None
-
-async def get_page_content(context, url):
-    """Fetches the text content of a webpage using an existing browser context."""
+# Set by init_env(); importing this module has no side effects
+API_KEY = None
+BASE_URL = DEFAULT_BASE_URL
+
+def init_env():
+    """Loads .env and reads the API key and endpoint; exits if no key is configured."""
+    global API_KEY, BASE_URL
+    from dotenv import load_dotenv
+    load_dotenv(override=True)
+
+    API_KEY = os.getenv("MOONSHOT_API_KEY")
+    if not API_KEY or API_KEY == "your_api_key_here":
+        print("Error: MOONSHOT_API_KEY not found or not set in .env file.")
+        print("Please edit .env and add your actual API key.")
+        sys.exit(1)
+
+    # Point at any OpenAI-compatible endpoint (e.g. a local fake server) via MOONSHOT_BASE_URL
+    BASE_URL = os.getenv("MOONSHOT_BASE_URL", DEFAULT_BASE_URL)
+
+MODEL = "kimi-k2-turbo-preview"
+# Bump whenever the prompt below changes so cached analyses are not reused
+PROMPT_VERSION = "2"
+
+# Statuses meaning the current Tor exit is blocked; the worker moves to a new circuit
+ROTATE_STATUSES = (403, 429)
+
+# How often a domain is retried after a browser crash took its fetch down
+CRASH_REQUEUES = 2
+
+async def get_page_content(context, url, policy=None, extractor="dom", fetch_info=None, challenges=None, trace=None):
+    """Fetches the text content of a webpage using an existing browser context.
+
+    If a ResourcePolicy is given, heavy assets and trackers are aborted before they load.
+    extractor picks how text is pulled out of the page (see extractors.py).
+    If fetch_info is a dict, the response status and any challenge vendor are stored in it.
+    Returns None if a challenge page does not clear within the ChallengeHandler's cap.
+    Time per phase (new_page, navigate, challenge, extract) is recorded on trace.
+    """
+    from playwright_stealth import Stealth
+
+    challenges = challenges or ChallengeHandler()
+    trace = trace or NULL_TRACE
     page = None
     try:
-        page = await context.new_page()
-        
-        # Apply stealth
-        stealth = Stealth()
-        await stealth.apply_stealth_async(page)
+        with trace.span("new_page"):
+            page = await context.new_page()
+            
+            # Apply stealth
+            stealth = Stealth()
+            await stealth.apply_stealth_async(page)
+
+            # Block images/fonts/trackers we would throw away anyway
+            blocked = await policy.attach(page) if policy else None
         
         # Add https:// if missing
         if not url.startswith("http"):
@@ -63,46 +87,98 @@ async def get_page_content(context, url):
         print(f"Visiting {target_url}...")
         
         try:
-            # Increased timeout for Tor
-            response = await page.goto(target_url, timeout=60000, wait_until="domcontentloaded")
+            with trace.span("navigate"):
+                # Increased timeout for Tor
+                response = await page.goto(target_url, timeout=60000, wait_until="domcontentloaded")
+            if response:
+                trace.set(http_status=response.status)
+                if fetch_info is not None:
+                    fetch_info["status"] = response.status
             
-            # Handle Cloudflare/DDOS-Guard challenges (202 Accepted / 503 Service Unavailable)
-            if response and (response.status == 202 or response.status == 503):
-                print(f"  -> Received status {response.status}, waiting for challenge resolution...")
-                await page.wait_for_timeout(15000)
+            # Handle Cloudflare/DDOS-Guard challenges: wait for the interstitial to go away, not a fixed time
+            with trace.span("challenge"):
+                vendor, cleared = await challenges.handle(page, response)
+            if vendor:
+                trace.set(challenge=vendor, challenge_cleared=cleared)
+                if fetch_info is not None:
+                    fetch_info["challenge"] = vendor
+                if not cleared:
+                    print(f"  -> {vendor} challenge on {url} did not clear within {challenges.max_wait:.0f}s")
+                    return None
+                print(f"  -> {vendor} challenge on {url} cleared")
                 
         except Exception as e:
             print(f"  -> Error navigating to {url}: {e}")
+            trace.count("errors")
+            trace.set(error=type(e).__name__)
             return None
 
-        content = await page.content()
-        
-        # Parse HTML and extract text
-        soup = BeautifulSoup(content, 'html.parser')
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header", "noscript"]):
-            script.decompose()
-            
-        text = soup.get_text(separator=' ', strip=True)
+        # Strip script/style/nav/footer elements and extract text
+        with trace.span("extract"):
+            text = await extract_text(page, extractor)
+        trace.count("text_chars", len(text))
+
+        if blocked and blocked["requests"]:
+            print(f"  -> Blocked {blocked['requests']} requests (~{blocked['bytes'] // 1024} KB saved) on {url}")
+            trace.count("blocked_requests", blocked["requests"])
+            trace.count("blocked_bytes_est", blocked["bytes"])
         return text
         
     except Exception as e:
         print(f"  -> Unexpected error fetching {url}: {e}")
+        trace.count("errors")
+        trace.set(error=type(e).__name__)
         return None
     finally:
         if page:
             await page.close()
 
-def analyze_content(text, domain):
-    """Sends the content to Kimi LLM for analysis."""
+async def fetch_content(context, url, policy=None, extractor="dom", fetcher=None, fetch_info=None, proxy=None,
+                        challenges=None, trace=None):
+    """Tiered fetch: tries a plain HTTP GET first when an HttpFetcher is given, then the browser."""
+    trace = trace or NULL_TRACE
+    if fetch_info is None:
+        fetch_info = {}
+    if fetcher:
+        with trace.span("http_fetch"):
+            text = await fetcher.fetch(url, proxy, fetch_info)
+        trace.count("http_bytes", fetch_info.get("http_bytes", 0))
+        if text is not None:
+            fetcher.record("http")
+            trace.set(tier="http", http_status=fetch_info.get("http_status"))
+            trace.count("text_chars", len(text))
+            return text
+    text = await get_page_content(context, url, policy, extractor, fetch_info, challenges, trace)
+    trace.set(tier="browser")
+    if fetcher:
+        fetcher.record("browser" if text else "failed")
+    return text
+
+async def analyze_content(text, domain, backend, cache=None, token_budget=4000, trace=None):
+    """Sends the content to Kimi LLM for analysis, reusing a cached result when available.
+
+    The text is first reduced to its most relevant paragraphs within token_budget.
+    """
     if not text:
         return "No content extracted."
-    
-    # Truncate text
-    max_chars = 15000 
-    if len(text) > max_chars:
-        text = text[:max_chars] + "...(truncated)"
+    trace = trace or NULL_TRACE
+
+    cache_key = None
+    if cache:
+        cache_key = cache.make_key(text, domain, MODEL, f"{PROMPT_VERSION}-t{token_budget}")
+        # SQLite work stays off the event loop
+        cached = await asyncio.to_thread(cache.get, cache_key)
+        if cached is not None:
+            trace.count("cache_hits")
+            return cached
+
+    # Drop boilerplate and keep the paragraphs the risk assessment needs (CPU-bound, so off the loop)
+    loop = asyncio.get_running_loop()
+    with trace.span("reduce"):
+        text, original_tokens, reduced_tokens = await loop.run_in_executor(None, reduce_content, text, token_budget)
+    print(f"  -> [{domain}] Content reduced from {original_tokens} to {reduced_tokens} tokens.")
+    trace.count("tokens_extracted", original_tokens)
+    trace.count("tokens_sent", reduced_tokens)
 
     prompt = f"""
     Analyze the following website content for the domain '{domain}'.
@@ -117,36 +193,457 @@ def analyze_content(text, domain):
     """
 
     try:
-        completion = client.chat.completions.create(
-            model="kimi-k2-turbo-preview",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that analyzes website content for risk assessment."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-        )
-        return completion.choices[0].message.content
+        with trace.span("llm"):
+            analysis = await backend.complete(
+                [
+                    {"role": "system", "content": "You are a helpful assistant that analyzes website content for risk assessment."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                trace=trace,
+            )
+        if cache and analysis:
+            await asyncio.to_thread(cache.put, cache_key, domain, analysis)
+        return analysis
     except Exception as e:
+        trace.count("errors")
+        trace.set(error=type(e).__name__)
         return f"Error calling Kimi API: {e}"
 
-async def main():
+class OrderedWriter:
+    """Writes result blocks in domain-list order, buffering any that finish early.
+
+    A domain is only checkpointed in the journal (and the domain store) once its
+    block is on disk, so a crash never marks a buffered (unwritten) result as done.
+    A block of None releases the slot without writing (the domain was deferred).
+    on_result(domain, block, status, error) is called as soon as a block is
+    submitted, without waiting for its turn in the file.
+    """
+
+    def __init__(self, f_out, journal=None, store=None, started_at=None, on_result=None):
+        self.f_out = f_out
+        self.journal = journal
+        self.store = store
+        self.started_at = started_at
+        self.on_result = on_result
+        self.written = 0
+        self.pending = {}
+        self.next_index = 0
+
+    def submit(self, index, domain, block, status="done", error=None):
+        if self.on_result and block is not None:
+            self.on_result(domain, block, status, error)
+        self.pending[index] = (domain, block, status, error)
+        # Flush every contiguous block we now have, so output stays ordered
+        while self.next_index in self.pending:
+            domain, block, status, error = self.pending.pop(self.next_index)
+            self.next_index += 1
+            if block is None:
+                continue
+            self.f_out.write(block)
+            self.f_out.flush()
+            self.written += 1
+            if self.written == 1 and self.started_at is not None:
+                print(f"  -> First result written {time.monotonic() - self.started_at:.1f}s after the scan started")
+            if self.journal:
+                self.journal.finish(domain, status, error)
+            if self.store:
+                self.store.set_status(domain, status)
+
+async def scan_domains(context, domains, f_out, backend, concurrency=1, policy=None, cache=None, journal=None,
+                       extractor="dom", batcher=None, token_budget=4000, store=None, fetcher=None,
+                       circuit_pool=None, new_context=None, challenges=None, deferred=None, source=None,
+                       metrics=None, browser_pool=None, on_result=None, near_dups=None, triage=None, text_dir=None):
+    """Fetches pages with N workers while LLM analyses overlap with fetching.
+
+    Fetch workers pull domains and push extracted text onto a bounded queue,
+    so fetching can only run ahead of analysis by a fixed amount. With a
+    BatchAnalyzer, several domains share one LLM request. With an HttpFetcher,
+    static pages are served over plain HTTP and only the rest open a browser page.
+
+    With a CircuitPool, each fetch worker gets its own browser context (from
+    new_context(circuit)) pinned to its own Tor circuit, and switches to a
+    fresh circuit when a site blocks it.
+
+    Domains whose challenge page does not clear go to the DeferredRetryQueue
+    and are retried after a backoff (on a fresh circuit, if blocked) while the
+    main pass carries on; their results are written after the main list.
+
+    With a source queue, domains arriving on it (until a None sentinel) are
+    scanned after the initial list, in arrival order, as soon as a worker is
+    free; the queue's maxsize is the backpressure on whoever fills it.
+
+    With a BrowserPool, each fetch worker leases its own recycled context from
+    it (context is unused), and domains whose fetch was lost to a browser
+    crash are re-queued up to CRASH_REQUEUES times.
+
+    With a NearDuplicateIndex, the first page of each cluster of near-identical
+    pages is analyzed and its verdict is reused for the rest; every block
+    then carries a "Cluster:" line.
+
+    With a Triager, pages it rates off-topic are written as skipped without an
+    LLM call, and high-risk pages are analyzed ahead of the rest waiting.
+    With a text_dir, every extracted text is saved there (for eval_triage.py).
+
+    With Metrics, every domain gets a trace of its fetch/analysis spans and
+    counters, finished (and written to the JSONL trace) with its outcome.
+    """
+    concurrency = max(1, concurrency)
+    domain_queue = asyncio.Queue()
+    # (priority, sequence, item): high-risk pages jump the line, the rest stay FIFO
+    analysis_queue = asyncio.PriorityQueue(maxsize=concurrency * 2)
+    sequence = itertools.count()
+    writer = OrderedWriter(f_out, journal, store, started_at=time.monotonic(), on_result=on_result)
+
+    for i, domain in enumerate(domains):
+        domain_queue.put_nowait((i, domain))
+    # Retries and streamed domains are written after every domain of the initial list
+    next_index = len(domains)
+    source_done = source is None
+    requeued = collections.Counter()
+
+    async def next_job():
+        """Returns (index, domain, attempt) for a ready retry or the next domain, or None when done."""
+        nonlocal next_index, source_done
+        while True:
+            ready = deferred.pop_ready() if deferred else None
+            if ready:
+                domain, attempt = ready
+                next_index += 1
+                return next_index - 1, domain, attempt
+            try:
+                i, domain = domain_queue.get_nowait()
+                return i, domain, 0
+            except asyncio.QueueEmpty:
+                pass
+            delay = deferred.next_delay() if deferred else None
+            if not source_done:
+                try:
+                    domain = await asyncio.wait_for(source.get(), delay)
+                except asyncio.TimeoutError:
+                    continue
+                if domain is None:
+                    source_done = True
+                    # Wake any other worker blocked on the queue
+                    source.put_nowait(None)
+                    continue
+                next_index += 1
+                return next_index - 1, domain, 0
+            if delay is None:
+                return None
+            await asyncio.sleep(min(delay, 1.0))
+
+    async def fetch_worker(worker_id):
+        worker_context = context
+        circuit = None
+        if circuit_pool:
+            circuit = circuit_pool.acquire(worker_id)
+            if not browser_pool:
+                worker_context = await new_context(circuit)
+        try:
+            while True:
+                job = await next_job()
+                if job is None:
+                    return
+                i, domain, attempt = job
+                if attempt:
+                    progress = f"retry {attempt}"
+                else:
+                    progress = f"{i+1}/{len(domains)}" if i < len(domains) else f"streamed #{i+1}"
+                print(f"\n[{progress}] Processing: {domain}")
+                if journal:
+                    journal.start(domain)
+
+                trace = metrics.trace("domain", domain) if metrics else NULL_TRACE
+                trace.set(attempt=attempt, worker=worker_id)
+
+                # 1. Get Content
+                fetch_info = {}
+                started = time.perf_counter()
+                proxy = circuit.proxy_url if circuit else None
+                if browser_pool:
+                    async with browser_pool.lease(worker_id, circuit) as lease:
+                        content = await fetch_content(lease.context, domain, policy, extractor, fetcher, fetch_info,
+                                                      proxy, challenges, trace)
+                    if content is None and lease.lost and requeued[domain] < CRASH_REQUEUES:
+                        # The browser died under this fetch; try the domain again on the relaunched one
+                        requeued[domain] += 1
+                        print(f"  -> [{domain}] Lost to a browser crash; re-queued.")
+                        domain_queue.put_nowait((i, domain))
+                        trace.finish("requeued")
+                        continue
+                else:
+                    content = await fetch_content(worker_context, domain, policy, extractor, fetcher, fetch_info,
+                                                  proxy, challenges, trace)
+                if content is None and fetch_info.get("challenge") and deferred and deferred.defer(domain, attempt + 1):
+                    writer.submit(i, domain, None)
+                    trace.finish("deferred")
+                else:
+                    if content is not None and attempt:
+                        deferred.recovered += 1
+                    if content and text_dir:
+                        path = os.path.join(text_dir, re.sub(r"[^\w.-]", "_", domain) + ".txt")
+                        with open(path, "w", encoding="utf-8") as f_text:
+                            f_text.write(content)
+                    verdict = None
+                    if content and triage:
+                        with trace.span("triage"):
+                            verdict = await asyncio.to_thread(triage.classify, content)
+                        trace.set(triage=verdict.decision, relevance=verdict.relevance, risk=verdict.risk)
+                    if verdict and verdict.decision == SKIP:
+                        print(f"  -> [{domain}] Triage: not crypto/investment related; skipping the LLM.")
+                        writer.submit(i, domain, f"--- Domain: {domain} ---\nSkipped: not crypto/investment related "
+                                                 f"(triage relevance {verdict.relevance:g}, risk {verdict.risk}).\n\n")
+                        trace.count("llm_calls_saved")
+                        trace.finish("triage_skip")
+                    else:
+                        if verdict and verdict.decision == HIGH:
+                            print(f"  -> [{domain}] Triage: high risk ({', '.join(verdict.indicators)}); analyzing first.")
+                        priority = 0 if verdict and verdict.decision == HIGH else 1
+                        await analysis_queue.put((priority, next(sequence),
+                                                  (i, domain, content, trace, time.perf_counter())))
+
+                if circuit:
+                    blocked = fetch_info.get("status") in ROTATE_STATUSES or fetch_info.get("challenge", False)
+                    circuit_pool.report(circuit, content is not None, time.perf_counter() - started, blocked)
+                    if circuit_pool.needs_rotation(circuit, blocked):
+                        if not browser_pool:
+                            await worker_context.close()
+                        if fetcher:
+                            await fetcher.discard(circuit.proxy_url)
+                        reason = f"blocked on {domain}" if blocked else "unhealthy endpoint"
+                        circuit = await circuit_pool.rotate(worker_id, reason)
+                        # A pooled context notices the new circuit on its next lease
+                        if not browser_pool:
+                            worker_context = await new_context(circuit)
+
+                # Sleep briefly
+                await asyncio.sleep(1)
+        finally:
+            if browser_pool:
+                await browser_pool.release(worker_id)
+            elif circuit:
+                await worker_context.close()
+
+    async def analysis_worker():
+        while True:
+            _, _, item = await analysis_queue.get()
+            if item is None:
+                return
+            i, domain, content, trace, queued_at = item
+            trace.add("queue_wait", time.perf_counter() - queued_at)
+
+            if content:
+                print(f"  -> [{domain}] Extracted {len(content)} characters. Analyzing...")
+
+                cluster = similarity = signature = None
+                if near_dups:
+                    with trace.span("near_dup"):
+                        signature = await asyncio.to_thread(near_dups.signature, content)
+                    if signature:
+                        cluster, similarity = near_dups.assign(domain, signature)
+                        trace.set(cluster=cluster.id, similarity=similarity)
+
+                analysis = None
+                if similarity is not None:
+                    # A clone of a page already sent to the LLM: wait for its verdict instead
+                    with trace.span("near_dup_wait"):
+                        analysis = await asyncio.shield(cluster.verdict)
+                    if analysis is not None:
+                        near_dups.reused += 1
+                        trace.count("llm_calls_saved")
+                        print(f"  -> [{domain}] Near-duplicate of {cluster.representative} "
+                              f"({similarity:.2f}); reusing its verdict.")
+
+                # 2. Analyze with Kimi
+                if analysis is None:
+                    try:
+                        if batcher:
+                            with trace.span("llm_batch"):
+                                analysis = await batcher.analyze(content, domain)
+                        else:
+                            analysis = await analyze_content(content, domain, backend, cache, token_budget, trace)
+                    finally:
+                        if cluster and similarity is None:
+                            # Clones fall back to their own analysis if this one failed
+                            ok = analysis is not None and not analysis.startswith("Error calling Kimi API")
+                            near_dups.resolve(cluster, analysis if ok else None)
+                llm_failed = analysis.startswith("Error calling Kimi API")
+
+                if cluster:
+                    if similarity is None:
+                        analysis = f"Cluster: {cluster.id}\n{analysis}"
+                    else:
+                        analysis = (f"Cluster: {cluster.id} (near-duplicate of {cluster.representative}, "
+                                    f"similarity {similarity:.2f})\n{analysis}")
+
+                # Safe print
+                try:
+                    print(f"  -> [{domain}] Analysis complete.")
+                except:
+                    pass
+
+                # 3. Save Result
+                if llm_failed:
+                    writer.submit(i, domain, f"--- Domain: {domain} ---\n{analysis}\n\n", "failed", "LLMError")
+                    trace.finish("llm_error")
+                else:
+                    writer.submit(i, domain, f"--- Domain: {domain} ---\n{analysis}\n\n")
+                    trace.finish("done")
+            else:
+                print(f"  -> [{domain}] Failed to extract content.")
+                writer.submit(i, domain, f"--- Domain: {domain} ---\nFailed to extract content.\n\n", "failed", "FetchError")
+                trace.finish("fetch_error")
+
+    # Batches can only fill up if enough analyses are waiting at once
+    analyst_count = concurrency * batcher.max_items if batcher else concurrency
+    analysts = [asyncio.create_task(analysis_worker()) for _ in range(analyst_count)]
+    try:
+        await asyncio.gather(*(fetch_worker(n) for n in range(concurrency)))
+        for _ in analysts:
+            await analysis_queue.put((2, next(sequence), None))
+        await asyncio.gather(*analysts)
+    finally:
+        for task in analysts:
+            task.cancel()
+
+async def main(args, source=None, store=None, domains=None, on_result=None):
+    """Scans crypto_domains.txt / the domain store.
+
+    For the streaming pipeline, source is an asyncio.Queue of further domains
+    (ending with None) and store is the DomainStore shared with the scraper.
+    Given an explicit domains list, only those (and the source) are scanned.
+    on_result is passed on to OrderedWriter. Calls init_env() if it has not run.
+    """
+    if API_KEY is None:
+        init_env()
     input_file = "crypto_domains.txt"
     output_file = "domain_analysis.txt"
-    
-    if not os.path.exists(input_file):
+
+    own_store = store is None and not args.no_db
+    if own_store:
+        store = DomainStore(args.db)
+
+    explicit = domains is not None
+    if explicit:
+        domains = list(domains)
+    elif os.path.exists(input_file):
+        # Read domains
+        with open(input_file, "r", encoding="utf-8") as f:
+            domains = [line.strip() for line in f if line.strip()]
+        if store:
+            added = store.add_many(domains)
+            if added:
+                print(f"Imported {len(added)} new domains from {input_file} into {args.db}")
+    elif not store and source is None:
         print(f"Error: {input_file} not found.")
         return
+    else:
+        domains = []
 
-    # Read domains
-    with open(input_file, "r", encoding="utf-8") as f:
-        domains = [line.strip() for line in f if line.strip()]
+    if store and not explicit:
+        # The store dedups and normalizes, and knows which domains are already scanned
+        domains = store.hosts_to_scan(include_done=args.no_resume, dead_ttl=args.recheck_dead_days * 86400)
 
     print(f"Found {len(domains)} domains to scan.")
 
+    policy = None
+    if not args.no_block_resources:
+        block_types = [t.strip() for t in args.block_types.split(",") if t.strip()]
+        block_hosts = DEFAULT_BLOCK_HOSTS + [h.strip() for h in args.block_hosts.split(",") if h.strip()]
+        policy = ResourcePolicy(block_types, block_hosts)
+
+    cache = None
+    if not args.no_cache:
+        cache = AnalysisCache(args.cache_file, ttl=args.cache_ttl_days * 86400, max_entries=args.cache_max_entries)
+
+    journal = None
+    if not args.no_resume:
+        journal = ScanJournal(args.journal, max_attempts=args.max_attempts, dead_ttl=args.recheck_dead_days * 86400)
+
+    backend = LLMBackend(
+        API_KEY,
+        MODEL,
+        base_url=BASE_URL,
+        timeout=args.llm_timeout,
+        max_retries=args.llm_retries,
+        max_connections=max(args.concurrency * 2, 10),
+        requests_per_minute=args.llm_rpm,
+        tokens_per_minute=args.llm_tpm,
+    )
+
+    batcher = None
+    if args.batch_size > 1:
+        batcher = BatchAnalyzer(
+            backend,
+            lambda text, domain: analyze_content(text, domain, backend, cache, args.token_budget),
+            cache=cache,
+            model=MODEL,
+            prompt_version=PROMPT_VERSION,
+            token_budget=args.batch_token_budget,
+            max_items=args.batch_size,
+            linger=args.batch_linger,
+            item_token_budget=args.token_budget,
+        )
+
+    try:
+        await run_scan(args, domains, output_file, backend, policy, cache, journal, batcher, store, source, on_result)
+    finally:
+        await backend.close()
+        if own_store:
+            store.close()
+        if cache:
+            cache.close()
+        if journal:
+            journal.close()
+
+    if policy:
+        blocked, saved = policy.summary()
+        print(f"\nResource policy blocked {blocked} requests (~{saved / 1_000_000:.1f} MB saved).")
+    if cache:
+        print(cache.stats_line())
+    if batcher:
+        print(batcher.stats_line())
+    if backend.retries:
+        print(f"LLM calls retried {backend.retries} times.")
+    if backend.prompt_tokens:
+        print(f"LLM usage: {backend.prompt_tokens} prompt tokens, {backend.completion_tokens} completion tokens.")
+
+async def prefilter_domains(domains, output_file, journal=None, store=None, concurrency=100, timeout=5.0):
+    """Drops domains that do not resolve or refuse connections, recording why.
+
+    Unreachable and DNS-timeout domains are kept but moved to the end of the list.
+    """
+    print(f"Checking DNS and TCP liveness of {len(domains)} domains...")
+    statuses = await check_liveness(domains, concurrency, timeout, timeout)
+    print(liveness_summary(statuses))
+    domains, skipped = partition(domains, statuses)
+    if skipped:
+        with open(output_file, "a", encoding="utf-8") as f_out:
+            for domain, status in skipped:
+                f_out.write(f"--- Domain: {domain} ---\nSkipped: {status.upper()} (liveness prefilter).\n\n")
+                if journal:
+                    # Not retried like a failure; rechecked after --recheck-dead-days
+                    journal.finish(domain, "dead", status.upper())
+                if store:
+                    store.set_status(domain, "dead")
+        print(f"Skipped {len(skipped)} dead domains.")
+    return domains
+
+async def run_scan(args, domains, output_file, backend, policy, cache, journal, batcher=None, store=None, source=None,
+                   on_result=None):
+    """Verifies the API key, launches the browser and scans the domains (then any streamed from source)."""
+    # Skip domains finished in an earlier (possibly interrupted) run
+    if journal:
+        domains = journal.pending(domains)
+        if not domains and source is None:
+            print("All domains already scanned. Nothing to do.")
+            return
+
     # Verify API Key before starting
     print("Verifying API key...")
     try:
-        client.models.list()
+        await backend.verify()
         print("API key verified successfully.")
     except Exception as e:
         print(f"API Key Verification Failed: {e}")
@@ -154,25 +651,55 @@ async def main():
         return
     
     # Check for Tor
-    tor_proxy = check_tor_proxy()
-    if tor_proxy:
-        print(f"Tor proxy detected at {tor_proxy}. Using Tor for anonymity.")
+    if args.tor_endpoints:
+        endpoints = [parse_endpoint(e) for e in args.tor_endpoints.split(",") if e.strip()]
+    else:
+        endpoints = detect_endpoints()
+    tor_proxy = None
+    circuit_pool = None
+    if endpoints:
+        tor_proxy = "socks5://%s:%d" % endpoints[0]
+        print(f"Tor proxy detected at {', '.join('%s:%d' % e for e in endpoints)}. Using Tor for anonymity.")
+        if not args.single_circuit:
+            # One isolated circuit per worker, spread over all endpoints
+            circuit_pool = CircuitPool(endpoints, max_failures=args.circuit_max_failures)
+            for (host, port), latency in (await circuit_pool.check_health()).items():
+                state = f"SOCKS handshake {latency * 1000:.0f} ms" if latency is not None else "not responding"
+                print(f"  {host}:{port}: {state}")
     else:
         print("Tor proxy not found. Running without Tor (some sites may block access).")
 
-    # Launch browser ONCE
+    if args.prefilter and domains:
+        if tor_proxy:
+            print("Note: the liveness prefilter resolves and connects directly, not through Tor.")
+        domains = await prefilter_domains(domains, output_file, journal, store,
+                                          args.prefilter_concurrency, args.prefilter_timeout)
+        if not domains and source is None:
+            print("No live domains left to scan.")
+            return
+
+    fetcher = None
+    if args.fetch_mode == "tiered":
+        try:
+            fetcher = HttpFetcher(proxy=tor_proxy, timeout=args.http_timeout,
+                                  max_connections=max(args.concurrency * 2, 10), extractor=args.extractor)
+        except ImportError as e:
+            print(f"HTTP tier unavailable ({e}); fetching every domain with the browser.")
+
+    from playwright.async_api import async_playwright
+
     async with async_playwright() as p:
         print("Launching browser...")
         
         launch_args = {"headless": True}
         if tor_proxy:
-            launch_args["proxy"] = {"server": tor_proxy}
+            # With a circuit pool every context sets its own proxy instead
+            if not circuit_pool:
+                launch_args["proxy"] = {"server": tor_proxy}
             launch_args["headless"] = False # Show browser when using Tor to reduce bot detection
-            
-        browser = await p.chromium.launch(**launch_args)
-        
-        # Create context with ignore_https_errors
-        context = await browser.new_context(
+
+        # Create contexts with ignore_https_errors
+        context_options = dict(
             ignore_https_errors=True,
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             viewport={"width": 1920, "height": 1080},
@@ -182,46 +709,129 @@ async def main():
             java_script_enabled=True
         )
 
+        # Relaunched on crashes and memory growth; every worker gets its own recycled context
+        browser_pool = await BrowserPool(p, launch_args, context_options, recycle_every=args.recycle_contexts,
+                                         max_rss_mb=args.max_browser_rss,
+                                         check_interval=args.memory_interval).start()
+
+        challenges = ChallengeHandler(max_wait=args.challenge_wait)
+        # A streamed scan (pipeline, daemon) can run indefinitely: keep percentiles over a recent window
+        metrics = Metrics("scanner", trace_path=args.trace_file or None,
+                          max_samples=10000 if source is not None else None)
+        near_dups = NearDuplicateIndex(threshold=args.near_dup_threshold) if args.near_dup else None
+        triage = Triager(args.triage_min_relevance, args.triage_min_risk, args.triage_high_risk) if args.triage else None
+        if args.text_dir:
+            os.makedirs(args.text_dir, exist_ok=True)
+        deferred = None
+        if args.challenge_retries > 0:
+            deferred = DeferredRetryQueue(max_retries=args.challenge_retries, base_delay=args.challenge_retry_delay)
+
         # Open output file
-        with open(output_file, "a", encoding="utf-8") as f_out:
-            for i, domain in enumerate(domains):
-                print(f"\n[{i+1}/{len(domains)}] Processing: {domain}")
-                
-                # 1. Get Content
-                content = await get_page_content(context, domain)
-                
-                if content:
-                    print(f"  -> Extracted {len(content)} characters. Analyzing...")
-                    
-                    # 2. Analyze with Kimi
-                    # Run in executor to avoid blocking the async loop
-                    loop = asyncio.get_running_loop()
-                    analysis = await loop.run_in_executor(None, analyze_content, content, domain)
-                    
-                    # 3. Save Result
-                    result_block = f"--- Domain: {domain} ---\n{analysis}\n\n"
-                    
-                    # Safe print
-                    try:
-                        print(f"  -> Analysis complete.")
-                    except:
-                        pass
-                        
-                    f_out.write(result_block)
-                    f_out.flush()
-                else:
-                    print("  -> Failed to extract content.")
-                    f_out.write(f"--- Domain: {domain} ---\nFailed to extract content.\n\n")
-                    f_out.flush()
+        try:
+            with open(output_file, "a", encoding="utf-8") as f_out:
+                await scan_domains(
+                    None, domains, f_out, backend,
+                    concurrency=args.concurrency,
+                    policy=policy,
+                    cache=cache,
+                    journal=journal,
+                    extractor=args.extractor,
+                    batcher=batcher,
+                    token_budget=args.token_budget,
+                    store=store,
+                    fetcher=fetcher,
+                    circuit_pool=circuit_pool,
+                    challenges=challenges,
+                    deferred=deferred,
+                    source=source,
+                    metrics=metrics,
+                    browser_pool=browser_pool,
+                    on_result=on_result,
+                    near_dups=near_dups,
+                    triage=triage,
+                    text_dir=args.text_dir,
+                )
+        finally:
+            metrics.count("llm_retries_total", backend.retries)
+            print(metrics.summary("Scan stage timing"))
+            metrics.write(args.metrics_summary, args.prometheus_file)
+            metrics.close()
+            print(challenges.summary())
+            if triage:
+                print(triage.summary())
+            if near_dups:
+                print(near_dups.summary())
+                if args.clusters_file:
+                    near_dups.write(args.clusters_file)
+            if deferred:
+                print(deferred.summary())
+            if fetcher:
+                await fetcher.close()
+                print(fetcher.summary())
+            if circuit_pool:
+                await circuit_pool.close()
+                print(circuit_pool.summary())
+            await browser_pool.close()
+            print(browser_pool.summary())
 
-                # Sleep briefly
-                await asyncio.sleep(1)
-        
-        await browser.close()
+def build_parser(description="Scan domains and analyze their content with Kimi"):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--concurrency", type=int, default=1, help="Number of pages to fetch in parallel (default: 1)")
+    parser.add_argument("--no-block-resources", action="store_true", help="Load every resource instead of aborting images, fonts and trackers")
+    parser.add_argument("--block-types", default=",".join(DEFAULT_BLOCK_TYPES), help="Comma-separated resource types to abort (default: %(default)s)")
+    parser.add_argument("--block-hosts", default="", help="Extra comma-separated hosts to abort, in addition to the built-in analytics list")
+    parser.add_argument("--cache-file", default="analysis_cache.sqlite", help="SQLite file caching LLM analyses (default: %(default)s)")
+    parser.add_argument("--cache-ttl-days", type=float, default=30, help="Re-analyze cached pages older than this many days (default: 30)")
+    parser.add_argument("--cache-max-entries", type=int, default=50000, help="Evict least recently used analyses beyond this count (default: 50000)")
+    parser.add_argument("--no-cache", action="store_true", help="Always call the LLM, ignoring the analysis cache")
+    parser.add_argument("--db", default="domains.sqlite", help="Shared domain store to read domains from and record scan status in (default: %(default)s)")
+    parser.add_argument("--no-db", action="store_true", help="Scan crypto_domains.txt as-is, without the domain store")
+    parser.add_argument("--journal", default="scan_journal.jsonl", help="Checkpoint journal used to resume interrupted scans (default: %(default)s)")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Stop retrying a failed domain after this many attempts (default: 3)")
+    parser.add_argument("--no-resume", action="store_true", help="Scan every domain from the top, ignoring the journal")
+    parser.add_argument("--extractor", choices=EXTRACTOR_NAMES, default="dom", help="Text extraction method (default: dom, an in-page innerText pass)")
+    parser.add_argument("--prefilter", action="store_true", help="Resolve DNS and probe TCP 443/80 for all domains first; skip NXDOMAIN/refused ones and scan unreachable ones last")
+    parser.add_argument("--prefilter-concurrency", type=int, default=100, help="Parallel liveness probes (default: 100)")
+    parser.add_argument("--prefilter-timeout", type=float, default=5, help="DNS and TCP connect timeout for the prefilter, in seconds (default: 5)")
+    parser.add_argument("--recheck-dead-days", type=float, default=7, help="Skip domains the prefilter found dead for this many days before probing them again (default: 7)")
+    parser.add_argument("--tor-endpoints", default="", help="Comma-separated Tor SOCKS endpoints, e.g. 127.0.0.1:9050,127.0.0.1:9052 (default: detect 9150/9050)")
+    parser.add_argument("--single-circuit", action="store_true", help="Route every worker through one Tor circuit instead of an isolated circuit per worker")
+    parser.add_argument("--circuit-max-failures", type=int, default=3, help="Consecutive failures before a Tor endpoint is avoided (default: 3)")
+    parser.add_argument("--challenge-wait", type=float, default=15, help="Max seconds to wait for a Cloudflare/DDoS-Guard challenge to clear (default: 15)")
+    parser.add_argument("--challenge-retries", type=int, default=2, help="Times a domain whose challenge did not clear is retried later, with backoff (default: 2, 0 disables)")
+    parser.add_argument("--challenge-retry-delay", type=float, default=30, help="Backoff before the first deferred retry, doubling after each (default: 30s)")
+    parser.add_argument("--recycle-contexts", type=int, default=100, help="Replace a worker's browser context after this many domains (default: %(default)s)")
+    parser.add_argument("--max-browser-rss", type=int, default=3000, metavar="MB", help="Restart the browser when it and its renderers use more than this much memory; 0 disables (needs psutil; default: %(default)s)")
+    parser.add_argument("--memory-interval", type=float, default=60, help="Seconds between memory samples (default: %(default)s)")
+    parser.add_argument("--fetch-mode", choices=["browser", "tiered"], default="browser", help="tiered: try a plain HTTP GET first and only open a browser page for challenges, empty or JS-rendered pages (default: browser)")
+    parser.add_argument("--http-timeout", type=float, default=15, help="Seconds before a plain HTTP fetch gives up and escalates to the browser (default: 15)")
+    parser.add_argument("--trace-file", default="scan_trace.jsonl", help="Append one JSON trace record per domain (spans, counters, outcome) here; empty to disable (default: %(default)s)")
+    parser.add_argument("--metrics-summary", help="Write the run's per-stage p50/p95 and counters to this JSON file")
+    parser.add_argument("--prometheus-file", help="Write the run's metrics in Prometheus text format to this file (e.g. for node_exporter's textfile collector)")
+    parser.add_argument("--llm-timeout", type=float, default=60, help="Seconds before an LLM request times out (default: 60)")
+    parser.add_argument("--llm-retries", type=int, default=5, help="Retries for 429/5xx/timeout LLM errors (default: 5)")
+    parser.add_argument("--llm-rpm", type=int, default=None, help="Requests per minute allowed to the LLM API (default: unlimited)")
+    parser.add_argument("--llm-tpm", type=int, default=None, help="Estimated tokens per minute allowed to the LLM API (default: unlimited)")
+    parser.add_argument("--triage", action="store_true", help="Score pages locally first: skip the LLM for off-topic pages and analyze high-risk ones first")
+    parser.add_argument("--triage-min-relevance", type=float, default=3, help="Distinct crypto/investment terms (generic finance words count 0.25) that make a page worth the LLM (default: %(default)s)")
+    parser.add_argument("--triage-min-risk", type=int, default=2, help="Scam-indicator score that sends a page to the LLM regardless of relevance (default: %(default)s)")
+    parser.add_argument("--triage-high-risk", type=int, default=5, help="Scam-indicator score that moves a page to the front of the LLM queue (default: %(default)s)")
+    parser.add_argument("--text-dir", help="Save every extracted page text here, e.g. to evaluate triage thresholds with benchmarks/eval_triage.py")
+    parser.add_argument("--near-dup", action="store_true", help="Cluster near-identical pages and send only the first of each cluster to the LLM, reusing its verdict for the rest")
+    parser.add_argument("--near-dup-threshold", type=float, default=0.8, help="Estimated text similarity (0-1) at which pages share a cluster (default: %(default)s)")
+    parser.add_argument("--clusters-file", default="clusters.json", help="With --near-dup, write clusters of more than one site here (default: %(default)s)")
+    parser.add_argument("--token-budget", type=int, default=4000, help="Max page-content tokens sent to the LLM per domain (default: 4000)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Analyze up to N domains per LLM request (default: 1, no batching)")
+    parser.add_argument("--batch-token-budget", type=int, default=12000, help="Estimated input tokens per batched request (default: 12000)")
+    parser.add_argument("--batch-linger", type=float, default=2.0, help="Seconds to wait for a batch to fill before sending it (default: 2)")
+    return parser
 
 if __name__ == "__main__":
+    args = build_parser().parse_args()
+    init_env()
+
     try:
-        asyncio.run(main())
+        asyncio.run(main(args))
     except KeyboardInterrupt:
         print("\nStopped by user.")
     except Exception as e:
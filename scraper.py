@@ -1,189 +1,421 @@
 import asyncio
-from playwright.async_api import async_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import argparse
+import collections
 import sys
 import os
+import re
+from ads_rpc import RpcCapture
+from domain_store import DomainStore, normalize_host
+from timing import Metrics, PhaseTimer
+
+# Point at a local fake of the Transparency Center (see benchmarks/fake_sites.py) via ADS_TRANSPARENCY_URL
+ADS_TRANSPARENCY_URL = os.getenv("ADS_TRANSPARENCY_URL", "https://adstransparency.google.com")
+
+# Caps (seconds) for each readiness wait; the wait ends as soon as the UI is ready
+DEFAULT_WAIT_CAPS = {
+    "navigate": 30.0,     # search box visible after page.goto
+    "suggestions": 5.0,   # suggestion list after typing the query
+    "results": 15.0,      # results page with the 'By domain' tab
+    "rows": 15.0,         # domain rows (or RPC payload) after opening a results page
+}
+
+ROW_SELECTORS = ["material-select-item[role='option']", "div[role='row']", "div[role='listitem']"]
+
+# One round trip: row count plus first/last row text identifies what the list currently shows
+ROW_SIGNATURE_JS = """
+(selectors) => {
+    for (const sel of selectors) {
+        const rows = document.querySelectorAll(sel);
+        if (rows.length) return rows.length + '|' + rows[0].innerText + '|' + rows[rows.length - 1].innerText;
+    }
+    return '';
+}
+"""
+
+async def extract_domains_from_dom(page, save_domain):
+    """Pulls domain-like text out of the results rows; returns how many new domains were saved."""
+    # Broad search for domain-like text
+    # Based on debug HTML, the items are material-select-item with role='option'
+    rows = []
+    for selector in ROW_SELECTORS:
+        rows = await page.locator(selector).all()
+        if rows:
+            break
+    
+    found = 0
+    if rows:
+        print(f"Found {len(rows)} rows/items. Extracting text...")
+        for row in rows:
+            # Try to find the specific name element
+            name_el = row.locator(".name")
+            if await name_el.count() > 0:
+                text = await name_el.first.inner_text()
+            else:
+                text = await row.inner_text()
+
+            # Simple heuristic to find domain in text
+            lines = text.split('\n')
+            for line in lines:
+                line = line.strip()
+                if '.' in line and ' ' not in line and len(line) > 3:
+                    # Exclude common non-domain words
+                    if line.lower() not in ['verified', 'unverified', 'about', 'ads']:
+                        if save_domain(line):
+                            found += 1
+    else:
+        # Fallback: Get all text and filter
+        print("No rows found. Scanning all text...")
+        body_text = await page.locator("body").inner_text()
+        lines = body_text.split('\n')
+        for line in lines:
+            line = line.strip()
+            if re.match(r'^[a-zA-Z0-9-]+\.[a-zA-Z]{2,}$', line):
+                 if line.lower() not in ['google.com', 'adstransparency.google.com']:
+                    if save_domain(line):
+                        found += 1
+    return found
+
+# Regional browser settings, like debug_location.py does for the UK. Locales stay
+# English ("en-XX") because the selectors below match English UI labels.
+REGION_SETTINGS = {
+    "AU": {"locale": "en-AU", "timezone_id": "Australia/Sydney", "geolocation": {"latitude": -33.8688, "longitude": 151.2093}},
+    "NZ": {"locale": "en-NZ", "timezone_id": "Pacific/Auckland", "geolocation": {"latitude": -36.8485, "longitude": 174.7633}},
+    "GB": {"locale": "en-GB", "timezone_id": "Europe/London", "geolocation": {"latitude": 51.5074, "longitude": -0.1278}},
+    "IE": {"locale": "en-IE", "timezone_id": "Europe/Dublin", "geolocation": {"latitude": 53.3498, "longitude": -6.2603}},
+    "US": {"locale": "en-US", "timezone_id": "America/New_York", "geolocation": {"latitude": 40.7128, "longitude": -74.0060}},
+    "CA": {"locale": "en-CA", "timezone_id": "America/Toronto", "geolocation": {"latitude": 43.6532, "longitude": -79.3832}},
+    "DE": {"locale": "en-DE", "timezone_id": "Europe/Berlin", "geolocation": {"latitude": 52.5200, "longitude": 13.4050}},
+    "FR": {"locale": "en-FR", "timezone_id": "Europe/Paris", "geolocation": {"latitude": 48.8566, "longitude": 2.3522}},
+    "NL": {"locale": "en-NL", "timezone_id": "Europe/Amsterdam", "geolocation": {"latitude": 52.3676, "longitude": 4.9041}},
+    "ES": {"locale": "en-ES", "timezone_id": "Europe/Madrid", "geolocation": {"latitude": 40.4168, "longitude": -3.7038}},
+    "IT": {"locale": "en-IT", "timezone_id": "Europe/Rome", "geolocation": {"latitude": 41.9028, "longitude": 12.4964}},
+    "IN": {"locale": "en-IN", "timezone_id": "Asia/Kolkata", "geolocation": {"latitude": 19.0760, "longitude": 72.8777}},
+    "SG": {"locale": "en-SG", "timezone_id": "Asia/Singapore", "geolocation": {"latitude": 1.3521, "longitude": 103.8198}},
+    "ZA": {"locale": "en-ZA", "timezone_id": "Africa/Johannesburg", "geolocation": {"latitude": -26.2041, "longitude": 28.0473}},
+    "AE": {"locale": "en-AE", "timezone_id": "Asia/Dubai", "geolocation": {"latitude": 25.2048, "longitude": 55.2708}},
+}
+# The Transparency Center uses GB, not UK
+REGION_ALIASES = {"UK": "GB"}
+
+def normalize_region(region):
+    region = region.strip().upper()
+    return REGION_ALIASES.get(region, region)
+
+async def new_region_context(browser, region):
+    """Creates a browser context whose locale, timezone and geolocation match the region."""
+    settings = REGION_SETTINGS.get(region)
+    if not settings:
+        return await browser.new_context()
+    return await browser.new_context(permissions=["geolocation"], **settings)
+
+async def wait_for_rows_stable(page, cap, previous=None, settle=0.4, poll=0.1):
+    """Waits until the results rows exist, differ from `previous` and stop changing for `settle` seconds.
+
+    Returns the final row signature (pass it as `previous` after paginating), or
+    whatever was last seen if `cap` seconds pass first.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + cap
+    last = None
+    stable_since = None
+    while loop.time() < deadline:
+        signature = await page.evaluate(ROW_SIGNATURE_JS, ROW_SELECTORS)
+        now = loop.time()
+        if signature and signature != previous:
+            if signature == last:
+                if now - stable_since >= settle:
+                    return signature
+            else:
+                last, stable_since = signature, now
+        await asyncio.sleep(poll)
+    return last
+
+async def wait_visible(locator, cap):
+    """Waits up to `cap` seconds for a locator to become visible; returns False on timeout."""
+    try:
+        await locator.first.wait_for(state="visible", timeout=cap * 1000)
+        return True
+    except PlaywrightTimeoutError:
+        return False
+
+async def scrape_query(page, query, region, max_pages, save_domain, capture=None, tag="", wait_caps=None, timer=None):
+    """Runs one search and scrapes its 'By domain' results; returns the number of new domains.
+
+    Every wait is a readiness condition capped by wait_caps[phase] seconds, and
+    time spent in each phase is recorded on `timer`.
+    """
+    caps = dict(DEFAULT_WAIT_CAPS, **(wait_caps or {}))
+    timer = timer or PhaseTimer()
+
+    def log(message):
+        print(f"{tag}{message}")
+
+    found_total = 0
+    log(f"--- Processing query: {query} (region {region}) ---")
+    url = f"{ADS_TRANSPARENCY_URL}/?region={region}"
+
+    with timer.phase("navigate"):
+        await page.goto(url)
+        
+        # Wait for the search input
+        search_input = page.locator("input[type='text']").first
+        await search_input.wait_for(state="visible", timeout=caps["navigate"] * 1000)
+    
+    with timer.phase("suggestions"):
+        await search_input.fill(query)
+        # Wait for suggestions (or the "See more results" link) to render
+        see_more = page.locator("text='See more results'")
+        suggestions = page.locator("material-select-item")
+        await wait_visible(see_more.or_(suggestions), caps["suggestions"])
+    
+    with timer.phase("search"):
+        # Try to click "See more results"
+        if await see_more.count() > 0 and await see_more.first.is_visible():
+            log("Clicking 'See more results'...")
+            await see_more.first.click()
+        elif await suggestions.count() > 0:
+            await suggestions.first.click()
+        else:
+            await search_input.press("Enter")
+    
+        log("Waiting for results page to load...")
+        by_domain_tab = page.locator("text='By domain'")
+        await wait_visible(by_domain_tab, caps["results"])
+
+    # Click "By domain" tab
+    log("Clicking 'By domain'...")
+    if await by_domain_tab.count() > 0:
+        with timer.phase("by_domain"):
+            if capture:
+                capture.reset()
+            try:
+                # Use force=True to bypass potential overlays or ripple effects
+                await by_domain_tab.first.click(force=True)
+            except Exception as e:
+                log(f"Click failed, trying JS click: {e}")
+                await by_domain_tab.first.evaluate("element => element.click()")
+    else:
+        log("Could not find 'By domain' tab. Skipping this query.")
+        return 0
+
+    # Scraping loop
+    page_num = 0
+    previous_rows = None
+    while True:
+        if max_pages > 0 and page_num >= max_pages:
+            break
+
+        log(f"Scraping page {page_num + 1} for '{query}'...")
+
+        found_on_page = 0
+        rpc_domains = []
+        if capture:
+            with timer.phase("rpc_capture"):
+                rpc_domains = await capture.collect(timeout=caps["rows"])
+        if rpc_domains:
+            # One network capture per results page instead of per-row DOM calls
+            log(f"Captured {len(rpc_domains)} domains from RPC responses.")
+            for domain in rpc_domains:
+                if save_domain(domain):
+                    found_on_page += 1
+        else:
+            if capture:
+                log("No RPC payload captured, falling back to DOM extraction.")
+            with timer.phase("wait_rows"):
+                # Wait for the list to change from the previous page and settle
+                previous_rows = await wait_for_rows_stable(page, caps["rows"], previous_rows)
+            with timer.phase("extract"):
+                found_on_page = await extract_domains_from_dom(page, save_domain)
+        
+        found_total += found_on_page
+        log(f"Found {found_on_page} new domains on page {page_num + 1}.")
+
+        # Pagination
+        next_button = page.locator("material-button[aria-label='Next page']").or_(page.locator("div[aria-label='Next page']"))
+        
+        if await next_button.count() > 0:
+                if await next_button.first.get_attribute("aria-disabled") == "true":
+                    log("Next button is disabled. Reached end of results.")
+                    break
+                
+                # If we are about to stop due to max_pages, don't click next
+                if max_pages > 0 and page_num >= max_pages - 1:
+                    break
+
+                log("Clicking Next page...")
+                with timer.phase("paginate"):
+                    if capture:
+                        capture.reset()
+                    # Remember what page N shows so the next wait can tell when page N+1 arrived
+                    previous_rows = await page.evaluate(ROW_SIGNATURE_JS, ROW_SELECTORS)
+                    try:
+                        await next_button.first.click()
+                    except:
+                        await next_button.first.click(force=True)
+        else:
+            log("Next button not found.")
+            break
+        
+        page_num += 1
+
+    return found_total
+
+async def scrape_ads_transparency(queries, region="AU", max_pages=1, headless=True, output_file=None, extraction="dom", workers=1,
+                                  wait_caps=None, store=None, domain_queue=None, metrics=None):
+    """Scrapes advertiser domains for every query in every region.
+
+    region may be a single code or a list; each query x region pair is a job, and
+    `workers` browser contexts (one page each) work through the jobs in parallel,
+    sharing one dedup set and one output file.
+
+    With a DomainStore, dedup uses its normalized domains and every sighting is
+    recorded with the query and region that found it; new domains are still
+    appended to output_file.
+
+    extraction="rpc" reads domains from the page's own RPC responses instead of
+    walking the DOM row by row, falling back to the DOM if nothing was captured.
+
+    With a domain_queue (an asyncio.Queue), every new domain is also handed to
+    it as soon as it is found. When the queue is full, domains wait in an
+    overflow list and the worker blocks before its next job until the
+    consumer catches up.
+
+    Each job is traced on `metrics` (a Metrics, created if not given): its
+    phase spans, new-domain count and outcome.
+    """
+    regions = [region] if isinstance(region, str) else list(region)
+    regions = list(dict.fromkeys(normalize_region(r) for r in regions))
+    jobs = asyncio.Queue()
+    for r in regions:
+        for query in queries:
+            jobs.put_nowait((query, r))
+    total_jobs = jobs.qsize()
+    completed = 0
+    metrics = metrics or Metrics("scraper")
 
-async def scrape_ads_transparency(queries, region="AU", max_pages=1, headless=True, output_file=None):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=headless)
-        context = await browser.new_context()
-        page = await context.new_page()
 
         unique_urls = set()
+        new_domains = 0
+        overflow = collections.deque()
         
         # Load existing domains if file exists to avoid duplicates
         if output_file and os.path.exists(output_file):
             try:
                 with open(output_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        unique_urls.add(line.strip())
-                print(f"Loaded {len(unique_urls)} existing domains from {output_file}")
+                    existing = [line.strip() for line in f if line.strip()]
+                if store is None:
+                    unique_urls.update(existing)
+                    print(f"Loaded {len(unique_urls)} existing domains from {output_file}")
+                elif store.count() == 0:
+                    # First run with the store: import the legacy flat file once
+                    store.add_many(existing)
+                    print(f"Imported {store.count()} existing domains from {output_file} into {store.path}")
             except Exception as e:
                 print(f"Error reading existing file: {e}")
 
         # Open file in append mode
         f_out = open(output_file, "a", encoding="utf-8") if output_file else None
+
+        def save_domain(domain, query="", job_region=""):
+            """Records a domain sighting; returns True if the domain is new."""
+            nonlocal new_domains
+            target = normalize_host(domain) or domain
+            if store:
+                domain = store.add(domain, query, job_region)
+                if domain is None:
+                    return False
+            else:
+                if domain in unique_urls:
+                    return False
+                unique_urls.add(domain)
+            new_domains += 1
+            print(domain)
+            if f_out:
+                f_out.write(domain + "\n")
+                f_out.flush()
+            if domain_queue is not None:
+                if overflow or domain_queue.full():
+                    overflow.append(target)
+                else:
+                    domain_queue.put_nowait(target)
+            return True
+
+        async def worker(worker_id):
+            nonlocal completed
+            # One context per region this worker has served, reused across its jobs
+            pages = {}
+            try:
+                while True:
+                    try:
+                        query, job_region = jobs.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    tag = f"[w{worker_id} {query}@{job_region}] " if workers > 1 else ""
+                    if job_region not in pages:
+                        context = await new_region_context(browser, job_region)
+                        page = await context.new_page()
+                        capture = None
+                        if extraction == "rpc":
+                            capture = RpcCapture()
+                            capture.attach(page)
+                        pages[job_region] = (context, page, capture)
+                    _, page, capture = pages[job_region]
+
+                    def save_job_domain(domain, query=query, job_region=job_region):
+                        return save_domain(domain, query, job_region)
+
+                    trace = metrics.trace("query", f"{query}@{job_region}")
+                    trace.set(query=query, region=job_region, worker=worker_id)
+                    status = "ok"
+                    try:
+                        found = await scrape_query(page, query, job_region, max_pages, save_job_domain, capture, tag,
+                                                   wait_caps, trace)
+                    except Exception as e:
+                        print(f"{tag}Error during processing of '{query}': {e}")
+                        found = 0
+                        status = "error"
+                        trace.count("errors")
+                        trace.set(error=f"{type(e).__name__}: {e}")
+                    trace.count("new_domains", found)
+                    trace.finish(status)
+                    if store:
+                        store.flush()
+                    # Backpressure: don't start another job while the consumer is behind
+                    while overflow:
+                        await domain_queue.put(overflow.popleft())
+                    completed += 1
+                    print(f"[{completed}/{total_jobs} jobs] '{query}' @ {job_region}: {found} new domains "
+                          f"({new_domains} new this run)")
+            finally:
+                for context, _, _ in pages.values():
+                    await context.close()
         
         try:
-            for query in queries:
-                print(f"\n--- Processing query: {query} ---")
-                url = f"https://adstransparency.google.com/?region={region}"
-                
-                try:
-                    await page.goto(url)
-                    
-                    # Wait for the search input
-                    search_input = page.locator("input[type='text']").first
-                    await search_input.wait_for(state="visible", timeout=10000)
-                    
-                    await search_input.fill(query)
-                    await page.wait_for_timeout(2000) # Wait for suggestions
-                    
-                    # Try to click "See more results"
-                    see_more = page.locator("text='See more results'")
-                    if await see_more.count() > 0 and await see_more.first.is_visible():
-                        print("Clicking 'See more results'...")
-                        await see_more.first.click()
-                    else:
-                        # Check for suggestions
-                        suggestions = page.locator("material-select-item")
-                        count = await suggestions.count()
-                        
-                        if count > 0:
-                            # print("Clicking the first suggestion...", file=sys.stderr)
-                            await suggestions.first.click()
-                        else:
-                            # print("No suggestions found, pressing Enter...", file=sys.stderr)
-                            await search_input.press("Enter")
-                    
-                    print("Waiting for results page to load...")
-                    await page.wait_for_timeout(3000)
-
-                    # Click "By domain" tab
-                    print("Clicking 'By domain'...")
-                    by_domain_tab = page.locator("text='By domain'")
-                    if await by_domain_tab.count() > 0:
-                        try:
-                            # Use force=True to bypass potential overlays or ripple effects
-                            await by_domain_tab.first.click(force=True)
-                        except Exception as e:
-                            print(f"Click failed, trying JS click: {e}")
-                            await by_domain_tab.first.evaluate("element => element.click()")
-                        
-                        await page.wait_for_timeout(3000) # Wait for domain list to load
-                    else:
-                        print("Could not find 'By domain' tab. Skipping this query.")
-                        continue
-
-                    # Scraping loop
-                    page_num = 0
-                    while True:
-                        if max_pages > 0 and page_num >= max_pages:
-                            break
-
-                        print(f"Scraping page {page_num + 1} for '{query}'...")
-                        await page.wait_for_timeout(2000) # Wait for content to load
-
-                        # Broad search for domain-like text
-                        # Based on debug HTML, the items are material-select-item with role='option'
-                        rows = await page.locator("material-select-item[role='option']").all()
-                        if not rows:
-                            rows = await page.locator("div[role='row']").all()
-                        if not rows:
-                            rows = await page.locator("div[role='listitem']").all()
-                        
-                        found_on_page = 0
-                        if rows:
-                            print(f"Found {len(rows)} rows/items. Extracting text...")
-                            for row in rows:
-                                # Try to find the specific name element
-                                name_el = row.locator(".name")
-                                if await name_el.count() > 0:
-                                    text = await name_el.first.inner_text()
-                                else:
-                                    text = await row.inner_text()
-
-                                # Simple heuristic to find domain in text
-                                lines = text.split('\n')
-                                for line in lines:
-                                    line = line.strip()
-                                    if '.' in line and ' ' not in line and len(line) > 3:
-                                        # Exclude common non-domain words
-                                        if line.lower() not in ['verified', 'unverified', 'about', 'ads']:
-                                            if line not in unique_urls:
-                                                unique_urls.add(line)
-                                                print(line)
-                                                if f_out:
-                                                    f_out.write(line + "\n")
-                                                    f_out.flush()
-                                                found_on_page += 1
-                        else:
-                            # Fallback: Get all text and filter
-                            print("No rows found. Scanning all text...")
-                            body_text = await page.locator("body").inner_text()
-                            lines = body_text.split('\n')
-                            import re
-                            for line in lines:
-                                line = line.strip()
-                                if re.match(r'^[a-zA-Z0-9-]+\.[a-zA-Z]{2,}$', line):
-                                     if line.lower() not in ['google.com', 'adstransparency.google.com']:
-                                        if line not in unique_urls:
-                                            unique_urls.add(line)
-                                            print(line)
-                                            if f_out:
-                                                f_out.write(line + "\n")
-                                                f_out.flush()
-                                            found_on_page += 1
-                        
-                        print(f"Found {found_on_page} new domains on page {page_num + 1}.")
-
-                        # Pagination
-                        next_button = page.locator("material-button[aria-label='Next page']").or_(page.locator("div[aria-label='Next page']"))
-                        
-                        if await next_button.count() > 0:
-                                if await next_button.first.get_attribute("aria-disabled") == "true":
-                                    print("Next button is disabled. Reached end of results.")
-                                    break
-                                
-                                # If we are about to stop due to max_pages, don't click next
-                                if max_pages > 0 and page_num >= max_pages - 1:
-                                    break
-
-                                print("Clicking Next page...")
-                                try:
-                                    await next_button.first.click()
-                                except:
-                                    await next_button.first.click(force=True)
-                                
-                                await page.wait_for_timeout(2000) # Wait for next page load
-                        else:
-                            print("Next button not found.")
-                            break
-                        
-                        page_num += 1
-                
-                except Exception as e:
-                    print(f"Error during processing of '{query}': {e}")
-                    continue
-
+            await asyncio.gather(*(worker(i + 1) for i in range(max(1, workers))))
         finally:
             if f_out:
                 f_out.close()
                 print(f"Results saved to {output_file}", file=sys.stderr)
             await browser.close()
+            print(metrics.summary("Scrape phase timing"))
 
-def main():
-    parser = argparse.ArgumentParser(description="Scrape Google Ads Transparency Center")
+def add_scrape_arguments(parser):
+    """Adds the query/region/paging options shared by scraper.py and pipeline.py."""
     parser.add_argument("queries", nargs='*', help="The search queries (e.g., 'Nike' 'Google')")
     parser.add_argument("--query-file", help="File containing search queries (one per line)")
-    parser.add_argument("--region", default="AU", help="Region code (default: AU)")
+    parser.add_argument("--region", action="append", help="Region code; repeat or comma-separate for several regions (default: AU)")
     parser.add_argument("--max-pages", type=int, default=1, help="Maximum number of pages to scrape per query")
     parser.add_argument("--visible", action="store_true", help="Run browser in visible mode (not headless)")
-    parser.add_argument("--output", help="Output file to save results (e.g., results.txt)")
-    
-    args = parser.parse_args()
-    
+    parser.add_argument("--extraction", choices=["dom", "rpc"], default="dom", help="Read domains from the results DOM or from the page's RPC responses (default: dom)")
+    parser.add_argument("--workers", type=int, default=1, help="Browser contexts running query x region jobs in parallel (default: 1)")
+    parser.add_argument("--wait-cap", action="append", default=[], metavar="PHASE=SECONDS",
+                        help=f"Override a readiness wait cap; phases: {', '.join(DEFAULT_WAIT_CAPS)} (repeatable)")
+
+def resolve_scrape_args(args):
+    """Returns (queries, regions, wait_caps) from parsed arguments, exiting on invalid input."""
     queries = args.queries
     if args.query_file:
         if os.path.exists(args.query_file):
@@ -202,7 +434,38 @@ def main():
         print("Please provide at least one search query via command line or --query-file.")
         sys.exit(1)
 
-    asyncio.run(scrape_ads_transparency(queries, args.region, args.max_pages, headless=not args.visible, output_file=args.output))
+    wait_caps = {}
+    for item in args.wait_cap:
+        phase, _, seconds = item.partition("=")
+        if phase not in DEFAULT_WAIT_CAPS:
+            print(f"Error: unknown wait phase '{phase}'. Choose from: {', '.join(DEFAULT_WAIT_CAPS)}")
+            sys.exit(1)
+        wait_caps[phase] = float(seconds)
+
+    regions = [r for value in (args.region or ["AU"]) for r in value.split(",") if r.strip()]
+    return queries, regions, wait_caps
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape Google Ads Transparency Center")
+    add_scrape_arguments(parser)
+    parser.add_argument("--output", help="Output file to save results (e.g., results.txt)")
+    parser.add_argument("--db", default="domains.sqlite", help="Shared domain store recording every domain with its query and region (default: %(default)s)")
+    parser.add_argument("--no-db", action="store_true", help="Only dedup against --output, without the domain store")
+    parser.add_argument("--trace-file", help="Append one JSON trace record per query x region job (phase spans, counters, outcome) here")
+    parser.add_argument("--metrics-summary", help="Write the run's per-phase p50/p95 and counters to this JSON file")
+    parser.add_argument("--prometheus-file", help="Write the run's metrics in Prometheus text format to this file")
+    args = parser.parse_args()
+    queries, regions, wait_caps = resolve_scrape_args(args)
+
+    store = None if args.no_db else DomainStore(args.db)
+    metrics = Metrics("scraper", trace_path=args.trace_file)
+    try:
+        asyncio.run(scrape_ads_transparency(queries, regions, args.max_pages, headless=not args.visible, output_file=args.output, extraction=args.extraction, workers=args.workers, wait_caps=wait_caps, store=store, metrics=metrics))
+    finally:
+        metrics.write(args.metrics_summary, args.prometheus_file)
+        metrics.close()
+        if store:
+            store.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,42 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from ads_rpc import FIXTURE_DIR, RpcCapture, extract_domains
+
+with open(os.path.join(FIXTURE_DIR, "expected.json"), "r", encoding="utf-8") as f:
+    EXPECTED = json.load(f)
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_fixture_domains(name):
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        assert extract_domains(f.read()) == EXPECTED[name]
+
+def test_google_hosts_and_file_names_are_ignored():
+    body = json.dumps(["https://www.gstatic.com/x.js", "banner.png", "https://www.Example-Shop.com/landing", "ok.io"])
+    assert extract_domains(")]}'\n" + body) == ["example-shop.com", "ok.io"]
+
+class FakeResponse:
+    url = "https://adstransparency.google.com/anji/_/rpc/SearchService/SearchCreatives"
+
+    def __init__(self, body, delay=0.0):
+        self.body = body
+        self.delay = delay
+
+    async def text(self):
+        await asyncio.sleep(self.delay)
+        return self.body
+
+def test_reset_drops_responses_from_the_previous_query():
+    async def scenario():
+        capture = RpcCapture()
+        # Still being read when the next query starts
+        capture._on_response(FakeResponse(json.dumps(["old-query.com"]), delay=0.05))
+        await asyncio.sleep(0)
+        capture.reset()
+        capture._on_response(FakeResponse(json.dumps(["new-query.com"])))
+        return await capture.collect(timeout=1.0, quiet=0.1)
+
+    assert asyncio.run(scenario()) == ["new-query.com"]
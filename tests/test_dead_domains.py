@@ -0,0 +1,36 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+from domain_store import DomainStore
+from scan_journal import ScanJournal
+
+def test_journal_skips_dead_domains_until_the_recheck_ttl(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = ScanJournal(str(path), max_attempts=3, dead_ttl=7 * 86400)
+    journal.finish("gone.com", "dead", "NXDOMAIN")
+    journal.finish("down.com", "failed", "TIMEOUT")
+    assert journal.pending(["gone.com", "down.com", "new.com"]) == ["down.com", "new.com"]
+    journal.close()
+
+    # Found dead 8 days ago: probed again, with a fresh retry budget
+    record = json.loads(path.read_text().splitlines()[0])
+    record.update(finished_at=(datetime.now(timezone.utc) - timedelta(days=8)).isoformat(timespec="seconds"), attempts=3)
+    path.write_text(json.dumps(record) + "\n")
+    journal = ScanJournal(str(path), max_attempts=3, dead_ttl=7 * 86400)
+    assert journal.pending(["gone.com"]) == ["gone.com"]
+    journal.start("gone.com")
+    assert journal.records["gone.com"]["attempts"] == 1
+    journal.close()
+
+def test_store_leaves_out_recently_dead_hosts(tmp_path):
+    store = DomainStore(str(tmp_path / "domains.sqlite"))
+    for host in ("gone.com", "alive.com", "done.com"):
+        store.add(host)
+    store.flush()
+    store.set_status("gone.com", "dead")
+    store.set_status("done.com", "done")
+    assert store.hosts_to_scan() == ["alive.com"]
+    assert store.hosts_to_scan(dead_ttl=7 * 86400) == ["alive.com"]
+    assert store.hosts_to_scan(dead_ttl=0) == ["gone.com", "alive.com"]
+    assert len(store.hosts_to_scan(include_done=True)) == 3
+    store.close()
@@ -0,0 +1,27 @@
+import pytest
+
+import domain_store
+from domain_store import DomainStore, registrable_domain
+
+@pytest.fixture(params=["tldextract", "fallback"])
+def suffixes(request, monkeypatch):
+    if request.param == "tldextract":
+        pytest.importorskip("tldextract")
+    else:
+        monkeypatch.setattr(domain_store, "_extract", None)
+        monkeypatch.setattr(domain_store, "_extract_loaded", True)
+    return request.param
+
+def test_registrable_domain(suffixes):
+    assert registrable_domain("shop.example.com") == "example.com"
+    assert registrable_domain("news.bbc.co.uk") == "bbc.co.uk"
+    assert registrable_domain("scam-one.vercel.app") == "scam-one.vercel.app"
+    assert registrable_domain("x.y.pages.dev") == "y.pages.dev"
+
+def test_sites_on_shared_hosting_are_separate_rows(suffixes, tmp_path):
+    store = DomainStore(str(tmp_path / "domains.sqlite"))
+    hosts = ["scam-one.vercel.app", "scam-two.vercel.app", "a.github.io", "b.github.io",
+             "x.pages.dev", "y.pages.dev", "www.coinflow.io", "coinflow.io/login"]
+    assert store.add_many(hosts) == hosts[:6] + ["coinflow.io"]
+    assert store.hosts_to_scan() == hosts[:6] + ["coinflow.io"]
+    store.close()
@@ -0,0 +1,33 @@
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from eval_triage import is_suspicious, parse_labels
+
+def test_bundled_analysis_labels():
+    # allcryptonews.net failed to extract and has no verdict
+    assert parse_labels(os.path.join(ROOT, "domain_analysis.txt")) == {"auscryptocon.com": (True, False)}
+
+@pytest.mark.parametrize("risk, suspicious", [
+    ("Appears legitimate: real venue and verifiable speakers; no obvious scam red-flags.", False),
+    ("Legitimate news outlet, without any signs of fraud.", False),
+    ("The site does not appear to be suspicious.", False),
+    ("Suspicious - promises guaranteed daily returns and hides its owners.", True),
+    ("Likely a scam: anonymous team, 3% daily ROI.", True),
+    ("Not legitimate; the licence number belongs to another company.", True),
+    ("Hard to say. Several red flags: offshore registration and Telegram-only support.", True),
+])
+def test_risk_stance(risk, suspicious):
+    assert is_suspicious(risk) is suspicious
+
+def test_json_verdicts(tmp_path):
+    verdict = {"domain": "coinflow.io", "summary": "Crypto trading bot.", "crypto_related": True,
+               "risk": "Potentially scammy: guaranteed returns.", "contacts": []}
+    path = tmp_path / "analysis.txt"
+    path.write_text(f"--- Domain: coinflow.io ---\n{json.dumps(verdict)}\n\n", encoding="utf-8")
+    assert parse_labels(str(path)) == {"coinflow.io": (True, True)}
@@ -0,0 +1,28 @@
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from challenges import DETECT_JS
+from extractors import IN_PAGE_JS, STRIP_TAGS
+from scraper import ROW_SIGNATURE_JS
+
+NODE = shutil.which("node")
+pytestmark = pytest.mark.skipif(NODE is None, reason="node is not installed")
+
+def run_node(script):
+    return subprocess.run([NODE, "-e", script], capture_output=True, text=True, timeout=30)
+
+@pytest.mark.parametrize("source", [IN_PAGE_JS, DETECT_JS, ROW_SIGNATURE_JS], ids=["extract", "challenge", "row"])
+def test_page_scripts_parse(source):
+    # page.evaluate() compiles the string as an expression, so check it the same way
+    result = run_node(f"new Function('return (' + {json.dumps(source)} + ')');")
+    assert result.returncode == 0, result.stderr
+
+def test_extract_script_joins_title_and_body():
+    fake_document = ("globalThis.document = {title: 'Coin Yield', body: {innerText: 'Invest now'}, "
+                     "querySelectorAll: () => []};")
+    result = run_node(f"{fake_document} console.log(JSON.stringify(({IN_PAGE_JS})({json.dumps(STRIP_TAGS)})));")
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == "Coin Yield\nInvest now"
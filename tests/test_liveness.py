@@ -0,0 +1,17 @@
+import asyncio
+import socket
+import time
+
+import liveness
+from liveness import NXDOMAIN, check_liveness
+
+def test_slow_lookups_are_not_starved_of_threads(monkeypatch):
+    def slow_nxdomain(host, port, type=0):
+        time.sleep(0.5)
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    monkeypatch.setattr(liveness.socket, "getaddrinfo", slow_nxdomain)
+    domains = [f"gone-{i}.com" for i in range(200)]
+    statuses = asyncio.run(check_liveness(domains, concurrency=200, dns_timeout=2.0))
+    # With the default executor (at most 32 threads) most of these time out as dns-error
+    assert set(statuses.values()) == {NXDOMAIN}
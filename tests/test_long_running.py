@@ -0,0 +1,66 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from resource_policy import ResourcePolicy
+from timing import Metrics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_importing_scanner_does_not_load_the_llm_or_http_clients():
+    code = "import sys, scanner; print(sorted(m for m in ('openai', 'httpx') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=ROOT).stdout
+    assert out.strip() == "[]"
+
+def test_metrics_window_keeps_run_totals():
+    metrics = Metrics("test", max_samples=3)
+    for seconds in (10.0, 1.0, 1.0, 1.0, 2.0):
+        metrics.observe("fetch", seconds)
+    assert len(metrics.samples["fetch"]) == 3
+    stage = metrics.summary_dict()["stages"]["fetch"]
+    assert stage["count"] == 5 and stage["total_s"] == 15.0
+    assert stage["p95_s"] == 2.0
+    assert 'test_stage_seconds_count{stage="fetch"} 5' in metrics.prometheus()
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = type("Request", (), {"resource_type": resource_type, "url": url})()
+
+    async def abort(self, reason):
+        pass
+
+    async def continue_(self):
+        pass
+
+class FakePage:
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+def test_resource_policy_keeps_totals_not_per_domain_state():
+    async def scenario():
+        policy = ResourcePolicy(["image"], [])
+        for _ in range(3):
+            page = FakePage()
+            stats = await policy.attach(page)
+            await page.handler(FakeRoute("image", "https://a.com/x.png"))
+            await page.handler(FakeRoute("document", "https://a.com/"))
+            assert stats == {"requests": 1, "bytes": 40_000}
+        return policy
+
+    policy = asyncio.run(scenario())
+    assert policy.summary() == (3, 120_000)
+    assert not hasattr(policy, "saved_by_domain")
+
+def test_trace_attributes_cannot_overwrite_the_outcome(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    metrics = Metrics("test", trace_path=str(path))
+    trace = metrics.trace("domain", "coinflow.io")
+    trace.set(http_status=200, status=200, spans="x")
+    trace.finish("llm_error")
+    metrics.close()
+    record = json.loads(path.read_text())
+    assert record["status"] == "llm_error" and record["http_status"] == 200
+    assert record["attr_status"] == 200 and record["attr_spans"] == "x" and record["spans"] == {}
@@ -0,0 +1,21 @@
+from triage import HIGH, SEND, SKIP, Triager
+
+RETAIL = ("Summer sale on garden furniture. Free returns and exchange within 30 days. Pay a deposit today "
+          "and the rest on delivery. Gift cards, wallets and leather goods in store.")
+NEWS = ("Markets close higher. The retailer reported record profits and raised its dividend; shares rose "
+        "on the stock exchange as brokers upgraded the stock. Pension portfolios and bond yields were flat.")
+CRYPTO = ("Join 12,000 investors earning with our AI trading bot. Guaranteed returns of 3% daily on your "
+          "Bitcoin deposit. Limited spots left, contact us on Telegram. Send USDT to "
+          "0x52908400098527886E0F7030069857D2E4169EE7")
+
+def test_generic_shop_and_news_pages_are_skipped():
+    triager = Triager()
+    for text in (RETAIL, NEWS):
+        result = triager.classify(text)
+        assert result.decision == SKIP, result
+        assert result.relevance < 3
+
+def test_crypto_pages_are_sent_or_prioritized():
+    triager = Triager()
+    assert triager.classify(CRYPTO).decision == HIGH
+    assert triager.classify("Learn crypto trading and forex with our staking guide.").decision == SEND
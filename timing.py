@@ -0,0 +1,219 @@
+import json
+import math
+import time
+from collections import Counter, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+# Fields Metrics.record() writes itself; trace attributes with these names are prefixed with "attr_"
+RESERVED_TRACE_KEYS = frozenset({"ts", "kind", "key", "status", "duration_s", "spans", "counters"})
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers (None for an empty list)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class PhaseTimer:
+    """Accumulates wall-clock time per named phase across a run."""
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def report(self, title="Phase timing"):
+        """Returns a table of total/mean seconds per phase and its share of all timed work."""
+        grand_total = sum(self.totals.values()) or 1.0
+        lines = [f"{title}:", f"  {'phase':<16} {'count':>6} {'total s':>9} {'mean s':>8} {'share':>6}"]
+        for name, total in sorted(self.totals.items(), key=lambda item: -item[1]):
+            count = self.counts[name]
+            lines.append(f"  {name:<16} {count:>6} {total:>9.1f} {total / count:>8.2f} {100 * total / grand_total:>5.0f}%")
+        return "\n".join(lines)
+
+class Trace:
+    """Spans, counters and attributes for one unit of work (a domain or a query).
+
+    phase()/add() match PhaseTimer, so a Trace can be passed wherever a timer
+    is expected. finish() writes one JSONL record and folds it into Metrics.
+    """
+
+    def __init__(self, metrics, kind, key):
+        self.metrics = metrics
+        self.kind = kind
+        self.key = key
+        self.spans = {}
+        self.counters = Counter()
+        self.attrs = {}
+        self.started = time.perf_counter()
+        self.finished = False
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    phase = span
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+        self.metrics.observe(name, seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def finish(self, status="ok", **attrs):
+        if self.finished:
+            return
+        self.finished = True
+        self.attrs.update(attrs)
+        self.metrics.record(self, status)
+
+class _NullTrace:
+    """Stand-in when no Metrics are configured; every call is a no-op."""
+
+    def span(self, name):
+        return nullcontext()
+
+    phase = span
+
+    def add(self, name, seconds):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+    def finish(self, status="ok", **attrs):
+        pass
+
+NULL_TRACE = _NullTrace()
+
+class Metrics:
+    """Run-wide stage timings, counters and per-item JSONL traces.
+
+    Span durations are kept per stage for p50/p95; counters are summed over
+    every finished trace plus anything counted directly with count(). The
+    summary is available as text, JSON, or Prometheus text exposition format.
+    With max_samples, percentiles cover only the latest max_samples spans per
+    stage (counts and totals still cover the whole run).
+    """
+
+    def __init__(self, namespace, trace_path=None, max_samples=None):
+        self.namespace = namespace
+        self.max_samples = max_samples
+        self.timer = PhaseTimer()
+        self.samples = {}
+        self.counters = Counter()
+        self.statuses = Counter()
+        self.started = time.perf_counter()
+        self._trace_file = open(trace_path, "a", encoding="utf-8") if trace_path else None
+
+    def trace(self, kind, key):
+        return Trace(self, kind, key)
+
+    def observe(self, stage, seconds):
+        self.timer.add(stage, seconds)
+        if stage not in self.samples:
+            self.samples[stage] = deque(maxlen=self.max_samples) if self.max_samples else []
+        self.samples[stage].append(seconds)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def record(self, trace, status):
+        self.statuses[status] += 1
+        self.counters.update(trace.counters)
+        if self._trace_file:
+            record = {
+                "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "kind": trace.kind,
+                "key": trace.key,
+                "status": status,
+                "duration_s": round(time.perf_counter() - trace.started, 3),
+                "spans": {name: round(seconds, 3) for name, seconds in trace.spans.items()},
+                "counters": dict(trace.counters),
+            }
+            record.update((f"attr_{name}" if name in RESERVED_TRACE_KEYS else name, value)
+                          for name, value in trace.attrs.items())
+            self._trace_file.write(json.dumps(record) + "\n")
+            self._trace_file.flush()
+
+    def summary_dict(self):
+        return {
+            "elapsed_s": round(time.perf_counter() - self.started, 2),
+            "statuses": dict(self.statuses),
+            "counters": dict(self.counters),
+            "stages": {
+                stage: {
+                    "count": self.timer.counts[stage],
+                    "total_s": round(self.timer.totals[stage], 3),
+                    "p50_s": round(percentile(values, 50), 3),
+                    "p95_s": round(percentile(values, 95), 3),
+                }
+                for stage, values in sorted(self.samples.items())
+            },
+        }
+
+    def summary(self, title="Stage timing"):
+        lines = [self.timer.report(title)]
+        if self.samples:
+            lines.append(f"  {'stage':<16} {'p50 s':>9} {'p95 s':>8}")
+            for stage, values in sorted(self.samples.items()):
+                lines.append(f"  {stage:<16} {percentile(values, 50):>9.2f} {percentile(values, 95):>8.2f}")
+        if self.statuses:
+            lines.append("Outcomes: " + ", ".join(f"{s} {n}" for s, n in self.statuses.most_common()))
+        if self.counters:
+            lines.append("Counters: " + ", ".join(f"{c} {n}" for c, n in sorted(self.counters.items())))
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """Returns the metrics in Prometheus text exposition format."""
+        ns = self.namespace
+        lines = [f"# HELP {ns}_stage_seconds Wall-clock seconds per stage.", f"# TYPE {ns}_stage_seconds summary"]
+        for stage, values in sorted(self.samples.items()):
+            for q in (50, 95):
+                lines.append(f'{ns}_stage_seconds{{stage="{stage}",quantile="{q / 100}"}} {percentile(values, q):.6f}')
+            lines.append(f'{ns}_stage_seconds_sum{{stage="{stage}"}} {self.timer.totals[stage]:.6f}')
+            lines.append(f'{ns}_stage_seconds_count{{stage="{stage}"}} {self.timer.counts[stage]}')
+        lines += [f"# HELP {ns}_items_total Finished items by outcome.", f"# TYPE {ns}_items_total counter"]
+        for status, n in sorted(self.statuses.items()):
+            lines.append(f'{ns}_items_total{{status="{status}"}} {n}')
+        lines += [f"# HELP {ns}_events_total Counted events (bytes, tokens, retries, errors).", f"# TYPE {ns}_events_total counter"]
+        for name, n in sorted(self.counters.items()):
+            lines.append(f'{ns}_events_total{{name="{name}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, summary_path=None, prometheus_path=None):
+        if summary_path:
+            with open(summary_path, "w", encoding="utf-8") as f:
+                json.dump(self.summary_dict(), f, indent=2)
+        if prometheus_path:
+            with open(prometheus_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus())
+
+    def close(self):
+        if self._trace_file:
+            self._trace_file.close()
+            self._trace_file = None
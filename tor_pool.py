@@ -0,0 +1,251 @@
+"""Pool of Tor circuits pinned to scanner workers.
+
+Tor puts streams with different SOCKS username/password pairs (IsolateSOCKSAuth,
+on by default) and streams from different SocksPorts on separate circuits. Each
+worker gets its own credentials, spread over all configured endpoints, and gets
+fresh credentials (a new circuit, usually a new exit) when a site blocks it.
+
+Chromium does not do SOCKS5 authentication, so browser contexts connect to a
+small local relay per circuit that performs the authentication upstream.
+"""
+import asyncio
+import secrets
+import socket
+import time
+
+def parse_endpoint(value):
+    """Turns "9050", "127.0.0.1:9050" or "socks5://host:port" into (host, port)."""
+    value = value.strip()
+    if "://" in value:
+        value = value.split("://", 1)[1]
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+async def socks5_handshake(reader, writer, username=None, password=None):
+    """Negotiates SOCKS5 (user/pass auth when credentials are given); raises ConnectionError on refusal."""
+    method = 0x02 if username else 0x00
+    writer.write(bytes([0x05, 0x01, method]))
+    await writer.drain()
+    reply = await reader.readexactly(2)
+    if reply != bytes([0x05, method]):
+        raise ConnectionError(f"SOCKS server rejected auth method {method}")
+    if username:
+        user, pwd = username.encode(), password.encode()
+        writer.write(bytes([0x01, len(user)]) + user + bytes([len(pwd)]) + pwd)
+        await writer.drain()
+        if (await reader.readexactly(2))[1] != 0x00:
+            raise ConnectionError("SOCKS authentication failed")
+
+async def _pipe(reader, writer):
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        writer.close()
+
+class SocksAuthRelay:
+    """Local no-auth SOCKS5 listener that forwards to an upstream SOCKS5 proxy with credentials."""
+
+    def __init__(self, host, port, username, password):
+        self.upstream = (host, port)
+        self.username = username
+        self.password = password
+        self.server = None
+        self.port = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def _handle(self, reader, writer):
+        upstream_writer = None
+        try:
+            _, n_methods = await reader.readexactly(2)
+            await reader.readexactly(n_methods)
+            upstream_reader, upstream_writer = await asyncio.open_connection(*self.upstream)
+            await socks5_handshake(upstream_reader, upstream_writer, self.username, self.password)
+            writer.write(b"\x05\x00")
+            await writer.drain()
+            # From here on the client's CONNECT request and the upstream reply pass through verbatim
+            await asyncio.gather(_pipe(reader, upstream_writer), _pipe(upstream_reader, writer))
+        except (asyncio.IncompleteReadError, ConnectionError, OSError):
+            writer.close()
+            if upstream_writer:
+                upstream_writer.close()
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+
+class Circuit:
+    """One isolated circuit: an endpoint plus the SOCKS credentials that select it."""
+
+    def __init__(self, endpoint, isolation=True):
+        self.endpoint = endpoint
+        self.username = f"scan-{secrets.token_hex(6)}" if isolation else None
+        self.password = secrets.token_hex(6) if isolation else None
+        self.requests = 0
+        self.failures = 0
+        self.blocks = 0
+        self.latency = None
+        self._relay = None
+
+    @property
+    def proxy_url(self):
+        """SOCKS URL (with the circuit credentials) for HTTP clients such as httpx."""
+        host, port = self.endpoint
+        auth = f"{self.username}:{self.password}@" if self.username else ""
+        return f"socks5://{auth}{host}:{port}"
+
+    async def browser_proxy(self):
+        """Playwright proxy settings for this circuit, starting its local relay on first use."""
+        host, port = self.endpoint
+        if not self.username:
+            return {"server": f"socks5://{host}:{port}"}
+        if self._relay is None:
+            self._relay = await SocksAuthRelay(host, port, self.username, self.password).start()
+        return {"server": f"socks5://127.0.0.1:{self._relay.port}"}
+
+    async def close(self):
+        if self._relay:
+            await self._relay.close()
+            self._relay = None
+
+class EndpointStats:
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.blocks = 0
+        self.rotations = 0
+        self.consecutive_failures = 0
+        self.latency_total = 0.0
+        self.latency_count = 0
+        self.healthy = True
+
+class CircuitPool:
+    """Pins one circuit per worker and rotates it on blocks or repeated failures.
+
+    Health and latency are tracked per circuit and per endpoint; an endpoint
+    that fails max_failures times in a row (or fails its SOCKS handshake) is
+    avoided until it succeeds again.
+    """
+
+    def __init__(self, endpoints, isolation=True, max_failures=3):
+        if not endpoints:
+            raise ValueError("CircuitPool needs at least one SOCKS endpoint")
+        self.endpoints = [parse_endpoint(e) if isinstance(e, str) else e for e in endpoints]
+        self.isolation = isolation
+        self.max_failures = max_failures
+        self.stats = {endpoint: EndpointStats() for endpoint in self.endpoints}
+        self.assigned = {}
+
+    def _pick_endpoint(self, avoid=None):
+        candidates = [e for e in self.endpoints if self.stats[e].healthy] or list(self.endpoints)
+        if avoid in candidates and len(candidates) > 1:
+            candidates.remove(avoid)
+        load = {e: 0 for e in candidates}
+        for circuit in self.assigned.values():
+            if circuit.endpoint in load:
+                load[circuit.endpoint] += 1
+        # Least loaded first, then lowest mean latency
+        return min(candidates, key=lambda e: (load[e], self._mean_latency(e)))
+
+    def _mean_latency(self, endpoint):
+        stats = self.stats[endpoint]
+        return stats.latency_total / stats.latency_count if stats.latency_count else 0.0
+
+    def acquire(self, worker):
+        """Returns the worker's pinned circuit, creating one on first use."""
+        if worker not in self.assigned:
+            self.assigned[worker] = Circuit(self._pick_endpoint(), self.isolation)
+        return self.assigned[worker]
+
+    async def rotate(self, worker, reason=""):
+        """Replaces the worker's circuit with a fresh one (new credentials, preferably another endpoint)."""
+        old = self.assigned.pop(worker, None)
+        avoid = None
+        if old:
+            await old.close()
+            self.stats[old.endpoint].rotations += 1
+            avoid = old.endpoint
+        circuit = Circuit(self._pick_endpoint(avoid), self.isolation)
+        self.assigned[worker] = circuit
+        host, port = circuit.endpoint
+        print(f"  -> Rotating circuit for worker {worker}{f' ({reason})' if reason else ''} -> {host}:{port}")
+        return circuit
+
+    def report(self, circuit, ok, seconds=None, blocked=False):
+        """Records the outcome of one fetch made through circuit."""
+        stats = self.stats[circuit.endpoint]
+        circuit.requests += 1
+        stats.requests += 1
+        if blocked:
+            circuit.blocks += 1
+            stats.blocks += 1
+        if ok:
+            stats.consecutive_failures = 0
+            stats.healthy = True
+            if seconds is not None:
+                circuit.latency = seconds if circuit.latency is None else 0.7 * circuit.latency + 0.3 * seconds
+                stats.latency_total += seconds
+                stats.latency_count += 1
+        else:
+            circuit.failures += 1
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.consecutive_failures >= self.max_failures:
+                stats.healthy = False
+
+    def needs_rotation(self, circuit, blocked):
+        return blocked or not self.stats[circuit.endpoint].healthy
+
+    async def check_health(self, timeout=5.0):
+        """Runs a SOCKS handshake against every endpoint; returns {endpoint: seconds or None}."""
+        async def check(endpoint):
+            start = time.perf_counter()
+            writer = None
+            try:
+                reader, writer = await asyncio.wait_for(asyncio.open_connection(*endpoint), timeout)
+                username = f"health-{secrets.token_hex(4)}" if self.isolation else None
+                await asyncio.wait_for(socks5_handshake(reader, writer, username, "x" if username else None), timeout)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, OSError):
+                self.stats[endpoint].healthy = False
+                return endpoint, None
+            finally:
+                if writer:
+                    writer.close()
+            self.stats[endpoint].healthy = True
+            return endpoint, time.perf_counter() - start
+
+        return dict(await asyncio.gather(*(check(e) for e in self.endpoints)))
+
+    async def close(self):
+        for circuit in self.assigned.values():
+            await circuit.close()
+
+    def summary(self):
+        lines = ["Tor circuits:"]
+        for (host, port), stats in self.stats.items():
+            mean = f"{self._mean_latency((host, port)):.1f}s" if stats.latency_count else "-"
+            lines.append(f"  {host}:{port}  requests {stats.requests}, failures {stats.failures}, blocks {stats.blocks}, "
+                         f"rotations {stats.rotations}, mean fetch {mean}{'' if stats.healthy else ', UNHEALTHY'}")
+        return "\n".join(lines)
+
+def detect_endpoints(ports=(9150, 9050)):
+    """Returns the local Tor SOCKS ports that accept connections, as (host, port) pairs."""
+    found = []
+    for port in ports:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                found.append(("127.0.0.1", port))
+        except OSError:
+            pass
+    return found
@@ -0,0 +1,107 @@
+"""Local triage of extracted page text before it is sent to the LLM.
+
+Compiled keyword and regex sets score each page on two axes:
+
+    relevance  distinct crypto/investment terms on the page; everyday commerce
+               and finance-news words (returns, exchange, deposit, wallet, ...)
+               count a quarter each
+    risk       weighted scam indicators (guaranteed returns, wallet addresses,
+               countdowns and urgency, messenger-only contact, ...)
+
+and Triager turns the scores into a decision: SKIP (clearly off-topic, no LLM
+call), SEND, or HIGH (analyzed ahead of everything else waiting).
+
+    python triage.py page.txt ...    # scores and decisions for saved page texts
+"""
+import argparse
+import re
+from collections import namedtuple
+
+SKIP, SEND, HIGH = "skip", "send", "high"
+
+RELEVANCE_RE = re.compile(
+    r"\b(bitcoin|btc|ethereum|eth|usdt|usdc|tether|crypto\w*|blockchain|defi|nfts?|altcoins?|binance|coinbase|"
+    r"invest\w*|trading|traders?|forex|staking|roi|passive income|financial freedom|guaranteed returns)\b",
+    re.IGNORECASE,
+)
+# Also on any shop or news page, so they only add up alongside specific terms
+GENERIC_RELEVANCE_RE = re.compile(
+    r"\b(tokens?|wallets?|portfolios?|profits?|returns|yields?|mining|deposits?|withdraw\w*|brokers?|dividends?|"
+    r"exchange)\b",
+    re.IGNORECASE,
+)
+GENERIC_WEIGHT = 0.25
+
+# name: (weight, pattern)
+SCAM_INDICATORS = {
+    "guaranteed_returns": (3, r"\bguarantee[ds]?\b[^.\n]{0,40}\b(returns?|profits?|income|payouts?)\b"
+                              r"|\b(risk[- ]free|zero risk|no risk)\b"),
+    "periodic_return": (3, r"\b\d+(\.\d+)?\s?%\s*(daily|per day|a day|every day|weekly|per week|a week|monthly|per month)\b"),
+    "wallet_address": (2, r"\b0x[a-fA-F0-9]{40}\b|\bbc1[a-z0-9]{25,59}\b|\b[13][a-km-zA-HJ-NP-Z1-9]{25,34}\b"
+                          r"|\bT[1-9A-HJ-NP-Za-km-z]{33}\b"),
+    "trading_bot": (2, r"\b(ai|automated|auto)[- ]?trading\b|\btrading (bot|robot|algorithm)s?\b"),
+    "doubling": (2, r"\bdouble your (money|bitcoin|btc|crypto|investment|deposit)\b|\b\d+x your (money|investment|deposit)\b"),
+    "urgency": (1, r"\b(offer ends|limited (time|spots|places|offer)|only \d+ (spots|places|seats) left|act now|hurry|"
+                   r"last chance|don't miss out)\b|\b\d{1,2}:\d{2}:\d{2}\b"),
+    "messenger_contact": (1, r"\b(whatsapp|telegram)\b|\bt\.me/"),
+    "social_proof": (1, r"\b\d[\d,.]*\+? (investors|members|traders|users|people) (have )?(joined|signed up|earning|are earning)\b"),
+    "offshore": (1, r"\b(saint vincent|st\.? vincent|seychelles|marshall islands|vanuatu|belize|comoros|anjouan)\b"),
+    "celebrity": (1, r"\b(elon musk|as seen on|bill gates|martin lewis)\b"),
+}
+_INDICATORS = [(name, weight, re.compile(pattern, re.IGNORECASE)) for name, (weight, pattern) in SCAM_INDICATORS.items()]
+
+TriageResult = namedtuple("TriageResult", "decision relevance risk indicators")
+
+def score(text):
+    """Returns (relevance, risk, indicators): weighted distinct relevance terms, summed indicator weights, matched indicator names."""
+    relevance = (len({m.lower() for m in RELEVANCE_RE.findall(text)})
+                 + GENERIC_WEIGHT * len({m.lower() for m in GENERIC_RELEVANCE_RE.findall(text)}))
+    indicators = [name for name, _, pattern in _INDICATORS if pattern.search(text)]
+    risk = sum(SCAM_INDICATORS[name][0] for name in indicators)
+    return relevance, risk, indicators
+
+class Triager:
+    """Decides per page: HIGH at high_risk or more, SEND at min_relevance terms or min_risk, else SKIP."""
+
+    def __init__(self, min_relevance=3, min_risk=2, high_risk=5):
+        self.min_relevance = min_relevance
+        self.min_risk = min_risk
+        self.high_risk = high_risk
+        self.decisions = {SKIP: 0, SEND: 0, HIGH: 0}
+
+    def decide(self, relevance, risk):
+        if risk >= self.high_risk:
+            return HIGH
+        if relevance >= self.min_relevance or risk >= self.min_risk:
+            return SEND
+        return SKIP
+
+    def classify(self, text):
+        relevance, risk, indicators = score(text)
+        decision = self.decide(relevance, risk)
+        self.decisions[decision] += 1
+        return TriageResult(decision, relevance, risk, indicators)
+
+    def summary(self):
+        total = sum(self.decisions.values())
+        return (f"Triage: {total} pages; {self.decisions[SKIP]} skipped without an LLM call, "
+                f"{self.decisions[HIGH]} high priority, {self.decisions[SEND]} normal.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Score saved page texts with the local triage rules")
+    parser.add_argument("files", nargs="+", help="Text files (e.g. from scanner.py --text-dir)")
+    parser.add_argument("--min-relevance", type=float, default=3)
+    parser.add_argument("--min-risk", type=int, default=2)
+    parser.add_argument("--high-risk", type=int, default=5)
+    args = parser.parse_args()
+
+    triager = Triager(args.min_relevance, args.min_risk, args.high_risk)
+    for path in args.files:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            result = triager.classify(f.read())
+        print(f"{result.decision:<5} relevance {result.relevance:>5g}  risk {result.risk:>2}  {path}"
+              f"{'  (' + ', '.join(result.indicators) + ')' if result.indicators else ''}")
+    print(triager.summary())
+
+if __name__ == "__main__":
+    main()